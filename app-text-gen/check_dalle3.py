@@ -4,82 +4,123 @@ Check if Azure OpenAI DALL-E 3 is available and properly configured
 """
 
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+SEP70 = "=" * 70
+DASH70 = "-" * 70
+KEY_MASK = "*" * 20
 
-print("=" * 70)
+# Known failure signatures, matched in one scan of the error text
+ERROR_PATTERN = re.compile(
+    r"(?P<deploy>DeploymentNotFound|404)"
+    r"|(?P<auth>Unauthorized|401)"
+    r"|(?P<host>InvalidHost|(?i:endpoint))"
+)
+
+def download_image(session, url, path):
+    """Stream one image URL to disk"""
+    # Stream the PNG straight to disk instead of buffering it in memory
+    with session.get(
+        url,
+        stream=True,
+        timeout=30,
+        headers={"Accept-Encoding": "identity"}
+    ) as r:
+        r.raise_for_status()
+        with open(path, "wb") as f:
+            for chunk in r.iter_content(chunk_size=64 * 1024):
+                f.write(chunk)
+
+@dataclass(frozen=True)
+class Config:
+    """Azure OpenAI settings resolved once from the environment"""
+    endpoint: Optional[str]
+    api_key: Optional[str]
+    api_version: str
+    dalle_deployment: Optional[str]
+
+@lru_cache(maxsize=1)
+def load_config():
+    """Load .env once and snapshot the settings this check needs"""
+    load_dotenv()
+    env = dict(os.environ)
+    return Config(
+        endpoint=env.get("AZURE_OPENAI_ENDPOINT"),
+        api_key=env.get("AZURE_OPENAI_API_KEY"),
+        api_version=env.get("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
+        dalle_deployment=env.get("AZURE_OPENAI_DALLE_DEPLOYMENT")
+    )
+
+config = load_config()
+
+print(SEP70)
 print("Azure OpenAI DALL-E 3 Configuration Check")
-print("=" * 70)
+print(SEP70)
 
 # Step 1: Check environment variables
 print("\n[1] Checking environment variables...")
-print("-" * 70)
+print(DASH70)
 
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
-AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
-AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
-
-if AZURE_OPENAI_ENDPOINT:
-    print(f"[+] AZURE_OPENAI_ENDPOINT: {AZURE_OPENAI_ENDPOINT}")
+if config.endpoint:
+    print(f"[+] AZURE_OPENAI_ENDPOINT: {config.endpoint}")
 else:
     print("[-] AZURE_OPENAI_ENDPOINT: NOT SET")
 
-if AZURE_OPENAI_API_KEY:
-    print(f"[+] AZURE_OPENAI_API_KEY: {'*' * 20}... (key exists)")
+if config.api_key:
+    print(f"[+] AZURE_OPENAI_API_KEY: {KEY_MASK}... (key exists)")
 else:
     print("[-] AZURE_OPENAI_API_KEY: NOT SET")
 
-print(f"[+] AZURE_OPENAI_API_VERSION: {AZURE_OPENAI_API_VERSION}")
+print(f"[+] AZURE_OPENAI_API_VERSION: {config.api_version}")
 
 # Step 2: Validate endpoint format
 print("\n[2] Validating endpoint format...")
-print("-" * 70)
+print(DASH70)
 
-if AZURE_OPENAI_ENDPOINT:
-    if AZURE_OPENAI_ENDPOINT.startswith("https://"):
+if config.endpoint:
+    if config.endpoint.startswith("https://"):
         print(f"[+] Endpoint format valid (HTTPS)")
     else:
         print(f"[-] Endpoint should start with https://")
     
-    if ".openai.azure.com" in AZURE_OPENAI_ENDPOINT:
+    if ".openai.azure.com" in config.endpoint:
         print(f"[+] Correct Azure domain detected")
     else:
         print(f"[-] Endpoint should contain .openai.azure.com")
 
 # Step 3: Check if required packages are installed
 print("\n[3] Checking required packages...")
-print("-" * 70)
-
-try:
-    from openai import AzureOpenAI
-    print("[+] openai package installed")
-except ImportError:
-    print("[-] openai package NOT installed")
-    print("    Run: pip install openai")
-    sys.exit(1)
+print(DASH70)
 
-try:
-    from PIL import Image
-    print("[+] pillow (PIL) package installed")
-except ImportError:
-    print("[-] pillow package NOT installed")
-    print("    Run: pip install pillow")
+# (module, display name, pip package, required)
+PACKAGE_CHECKS = [
+    ("openai", "openai", "openai", True),
+    ("PIL", "pillow (PIL)", "pillow", False),
+    ("requests", "requests", "requests", False),
+]
 
-try:
-    import requests
-    print("[+] requests package installed")
-except ImportError:
-    print("[-] requests package NOT installed")
-    print("    Run: pip install requests")
+# find_spec only locates the package; the real imports happen where they are used
+for module, display_name, pip_name, required in PACKAGE_CHECKS:
+    if find_spec(module) is not None:
+        print(f"[+] {display_name} package installed")
+        continue
+    print(f"[-] {pip_name} package NOT installed")
+    print(f"    Run: pip install {pip_name}")
+    if required:
+        sys.exit(1)
 
 # Step 4: Try to connect to Azure OpenAI
 print("\n[4] Attempting to connect to Azure OpenAI...")
-print("-" * 70)
+print(DASH70)
 
-if not AZURE_OPENAI_ENDPOINT or not AZURE_OPENAI_API_KEY:
+if not config.endpoint or not config.api_key:
     print("[-] Cannot connect: Missing credentials")
     print("\n    Set in .env file:")
     print("    AZURE_OPENAI_ENDPOINT=https://<resource>.openai.azure.com/")
@@ -87,10 +128,21 @@ if not AZURE_OPENAI_ENDPOINT or not AZURE_OPENAI_API_KEY:
     sys.exit(1)
 
 try:
+    import httpx
+    from openai import AzureOpenAI
+    
+    # Share one keep-alive pool across every SDK call in this check and let
+    # the SDK (429/5xx) and the transport (connect errors) retry transient failures
     client = AzureOpenAI(
-        azure_endpoint=AZURE_OPENAI_ENDPOINT,
-        api_key=AZURE_OPENAI_API_KEY,
-        api_version=AZURE_OPENAI_API_VERSION
+        azure_endpoint=config.endpoint,
+        api_key=config.api_key,
+        api_version=config.api_version,
+        max_retries=3,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        http_client=httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30),
+            transport=httpx.HTTPTransport(retries=3)
+        )
     )
     print("[+] Successfully connected to Azure OpenAI")
 except Exception as e:
@@ -99,9 +151,9 @@ except Exception as e:
 
 # Step 5: Check for DALL-E 3 deployment
 print("\n[5] Checking for DALL-E 3 deployment...")
-print("-" * 70)
+print(DASH70)
 
-DALLE_DEPLOYMENT = os.getenv("AZURE_OPENAI_DALLE_DEPLOYMENT")
+DALLE_DEPLOYMENT = config.dalle_deployment
 
 if DALLE_DEPLOYMENT:
     print(f"[+] AZURE_OPENAI_DALLE_DEPLOYMENT: {DALLE_DEPLOYMENT}")
@@ -112,12 +164,12 @@ else:
 
 # Step 6: Test DALL-E 3 API call (dry run)
 print("\n[6] Testing DALL-E 3 API connectivity...")
-print("-" * 70)
+print(DASH70)
 
 try:
     print(f"    Deployment name: {DALLE_DEPLOYMENT}")
-    print(f"    API version: {AZURE_OPENAI_API_VERSION}")
-    print(f"    Endpoint: {AZURE_OPENAI_ENDPOINT}")
+    print(f"    API version: {config.api_version}")
+    print(f"    Endpoint: {config.endpoint}")
     print("\n    [*] Attempting test image generation (this will create an image)...")
     
     response = client.images.generate(
@@ -133,19 +185,41 @@ try:
     
     # Try to download the image
     print("\n[7] Attempting to download and save test image...")
-    print("-" * 70)
+    print(DASH70)
     
     try:
         import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        # Pooled session so repeated downloads reuse the TLS connection
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        ))
         
-        image_data = requests.get(response.data[0].url).content
-        test_image_path = "dalle3_test_image.png"
+        urls = [image.url for image in response.data]
+        image_paths = ["dalle3_test_image.png"] + [
+            f"dalle3_test_image_{i}.png" for i in range(1, len(urls))
+        ]
         
-        with open(test_image_path, "wb") as f:
-            f.write(image_data)
+        # Download every generated image concurrently over the shared session
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            list(pool.map(
+                lambda url, path: download_image(session, url, path),
+                urls, image_paths
+            ))
         
-        print(f"[+] Test image saved: {test_image_path}")
-        print(f"[+] File size: {len(image_data) / 1024:.1f} KB")
+        for test_image_path in image_paths:
+            size_kb = os.path.getsize(test_image_path) / 1024
+            print(f"[+] Test image saved: {test_image_path}")
+            print(f"[+] File size: {size_kb:.1f} KB")
         
     except Exception as e:
         print(f"[-] Could not download image: {e}")
@@ -156,7 +230,8 @@ except Exception as e:
     print(f"    Error: {error_str}")
     
     # Helpful error messages
-    if "DeploymentNotFound" in error_str or "404" in error_str:
+    error_kinds = {m.lastgroup for m in ERROR_PATTERN.finditer(error_str)}
+    if "deploy" in error_kinds:
         print("\n    Possible causes:")
         print("    1. DALL-E 3 deployment doesn't exist in your Azure resource")
         print("    2. Deployment name is incorrect")
@@ -167,7 +242,7 @@ except Exception as e:
         print("    - Ensure 'dall-e-3' deployment exists")
         print("    - Update AZURE_OPENAI_DALLE_DEPLOYMENT in .env with correct name")
     
-    elif "Unauthorized" in error_str or "401" in error_str:
+    elif "auth" in error_kinds:
         print("\n    Possible causes:")
         print("    1. Invalid API key")
         print("    2. API key for wrong resource")
@@ -175,7 +250,7 @@ except Exception as e:
         print("    - Verify API key in .env is correct")
         print("    - Check it's the key for the resource with DALL-E 3 deployment")
     
-    elif "InvalidHost" in error_str or "endpoint" in error_str.lower():
+    elif "host" in error_kinds:
         print("\n    Possible causes:")
         print("    1. Incorrect endpoint URL")
         print("    2. Missing trailing slash")
@@ -186,9 +261,9 @@ except Exception as e:
     sys.exit(1)
 
 # Summary
-print("\n" + "=" * 70)
+print("\n" + SEP70)
 print("SUMMARY")
-print("=" * 70)
+print(SEP70)
 
 print("""
 [+] Your Azure OpenAI DALL-E 3 is configured and working!
@@ -206,5 +281,5 @@ Next steps:
    Then type: 'image' to generate an image
 """)
 
-print("=" * 70)
+print(SEP70)
 
@@ -3,10 +3,108 @@
 Debug script to check embedding index integrity
 """
 import json
+import mmap
 import os
+import re
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+import json_utils
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+EMBEDDING_FILE = "embeddings/conversation_embeddings.json"
+# Optional float32 sidecar holding the same vectors as an (N, 1536) matrix, with a slim
+# JSON file of the metadata the report needs, so a fresh pair skips parsing the index
+EMBEDDING_ARRAY_FILE = "embeddings/conversation_embeddings.npy"
+EMBEDDING_META_FILE = "embeddings/conversation_embeddings.meta.json"
+# In the 2-space indented layout the index is saved in, entries open with a brace at
+# 4 spaces and their own keys sit at 6; JSON strings cannot hold raw newlines
+INDENTED_INDEX_START = b'{\n  '
+EMBEDDING_ARRAY_PATTERN = re.compile(rb'^    (\{)|^      "embedding"\s*:\s*\[([^\]]*)\]', re.M)
+
+def export_embedding_array(data, array_file=EMBEDDING_ARRAY_FILE, meta_file=EMBEDDING_META_FILE):
+    """Write all embeddings to a float32 .npy sidecar, plus the metadata the report shows"""
+    entries = data.get('entries', [])
+    matrix = np.array([e['embedding'] for e in entries], dtype=np.float32)
+    np.save(array_file, matrix)
+    with open(meta_file, 'w') as f:
+        json.dump({
+            "last_updated": data.get('last_updated'),
+            "pair_ids": [e.get('pair_id') for e in entries],
+            "first": entries[0] if entries else None
+        }, f)
+    return matrix.shape
+
+def load_embedding_array(embedding_file=EMBEDDING_FILE, array_file=EMBEDDING_ARRAY_FILE,
+                         meta_file=EMBEDDING_META_FILE):
+    """Memory-map the .npy sidecar and read its metadata if both are at least as new as the JSON index"""
+    index_mtime = os.path.getmtime(embedding_file)
+    for sidecar in (array_file, meta_file):
+        if not os.path.exists(sidecar) or os.path.getmtime(sidecar) < index_mtime:
+            return None
+    
+    matrix = np.load(array_file, mmap_mode='r')
+    meta = json_utils.load_file(meta_file)
+    if matrix.ndim != 2 or len(meta.get('pair_ids', [])) != matrix.shape[0]:
+        return None
+    return matrix, meta
+
+def stream_embedding_lengths(embedding_file=EMBEDDING_FILE):
+    """Count each entry's embedding dimension from ijson events, never building the vectors"""
+    lengths = []
+    with open(embedding_file, 'rb') as f:
+        for prefix, event, _ in ijson.parse(f):
+            if prefix == 'entries.item' and event == 'start_map':
+                lengths.append(0)  # Entries without an embedding stay at 0
+            elif prefix == 'entries.item.embedding.item':
+                lengths[-1] += 1
+    return lengths
+
+def parse_embedding_lengths(embedding_file=EMBEDDING_FILE):
+    """Count each entry's embedding dimension from a full parse of the index"""
+    data = json_utils.load_file(embedding_file)
+    return [len(e['embedding']) if 'embedding' in e else 0 for e in data.get('entries', [])]
+
+def scan_embedding_lengths(embedding_file=EMBEDDING_FILE):
+    """Count each entry's embedding dimension by scanning raw bytes, without parsing floats
+    
+    Entries without an embedding count as length 0, as in the full check.
+    """
+    if ijson:
+        return stream_embedding_lengths(embedding_file)
+    with open(embedding_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(INDENTED_INDEX_START)] != INDENTED_INDEX_START:
+                # Entry boundaries can only be found by indentation in the saved layout
+                return parse_embedding_lengths(embedding_file)
+            
+            lengths = []
+            for m in EMBEDDING_ARRAY_PATTERN.finditer(mm):
+                if m.group(1):
+                    lengths.append(0)  # Entries without an embedding stay at 0
+                elif lengths and m.group(2).strip():
+                    lengths[-1] = m.group(2).count(b',') + 1
+            return lengths
+
+def quick_check_embeddings():
+    """Validate embedding dimensions only, skipping the full JSON parse"""
+    if not os.path.exists(EMBEDDING_FILE):
+        print("❌ Embedding file not found!")
+        return
+    
+    lengths = scan_embedding_lengths()
+    valid_embeddings = lengths.count(1536)
+    print(f"Embeddings found: {len(lengths)}")
+    print(f"Valid embeddings (length=1536): {valid_embeddings}")
+    print(f"Invalid embeddings: {len(lengths) - valid_embeddings}")
 
 def check_embeddings():
-    embedding_file = "embeddings/conversation_embeddings.json"
+    embedding_file = EMBEDDING_FILE
     
     if not os.path.exists(embedding_file):
         print("❌ Embedding file not found!")
@@ -14,14 +112,36 @@ def check_embeddings():
     
     print("📖 Checking embeddings file...\n")
     
-    with open(embedding_file, 'r') as f:
-        data = json.load(f)
-    
-    entries = data.get('entries', [])
-    print(f"Total entries: {len(entries)}")
-    print(f"Last updated: {data.get('last_updated')}\n")
-    
-    if not entries:
+    sidecar = load_embedding_array(embedding_file)
+    if sidecar is not None:
+        # A fresh sidecar answers everything below without parsing the index
+        matrix, meta = sidecar
+        print(f"Using array sidecar: {EMBEDDING_ARRAY_FILE} {matrix.shape}")
+        pair_ids = meta['pair_ids']
+        first = meta.get('first') or {}
+        last_updated = meta.get('last_updated')
+        # The sidecar is a dense matrix, so its width is every entry's length
+        lengths = np.full(matrix.shape[0], matrix.shape[1], dtype=np.int32)
+    else:
+        # The index is mostly floats; json_utils parses them with orjson when it is installed
+        data = json_utils.load_file(embedding_file)
+        
+        entries = data.get('entries', [])
+        pair_ids = [e.get('pair_id') for e in entries]
+        first = entries[0] if entries else {}
+        last_updated = data.get('last_updated')
+        # Gather every length once and validate them as a single array
+        lengths = np.fromiter(
+            (len(e['embedding']) if 'embedding' in e else 0 for e in entries),
+            dtype=np.int32,
+            count=len(entries)
+        )
+    
+    total_entries = len(pair_ids)
+    print(f"Total entries: {total_entries}")
+    print(f"Last updated: {last_updated}\n")
+    
+    if not total_entries:
         print("⚠️  No entries found in index!")
         return
     
@@ -29,7 +149,6 @@ def check_embeddings():
     print("First Entry Details:")
     print("=" * 60)
     
-    first = entries[0]
     print(f"Pair ID: {first.get('pair_id')}")
     print(f"Conversation ID: {first.get('conversation_id')}")
     print(f"Model: {first.get('model')}")
@@ -42,9 +161,10 @@ def check_embeddings():
     
     if embedding:
         print(f"First 10 values: {embedding[:10]}")
-        print(f"Min value: {min(embedding):.6f}")
-        print(f"Max value: {max(embedding):.6f}")
-        print(f"Average value: {sum(embedding)/len(embedding):.6f}")
+        vector = np.asarray(embedding, dtype=np.float32)
+        print(f"Min value: {vector.min():.6f}")
+        print(f"Max value: {vector.max():.6f}")
+        print(f"Average value: {vector.mean():.6f}")
     
     print(f"\nUser message preview: {first.get('user_message', '')[:100]}...")
     print(f"Assistant message preview: {first.get('assistant_message', '')[:100]}...\n")
@@ -53,24 +173,22 @@ def check_embeddings():
     print("All Entries Summary:")
     print("=" * 60)
     
-    valid_embeddings = 0
-    missing_embeddings = 0
+    valid_mask = lengths == 1536
+    valid_embeddings = int(valid_mask.sum())
+    missing_embeddings = total_entries - valid_embeddings
     
-    for i, entry in enumerate(entries):
-        embedding = entry.get('embedding', [])
-        if len(embedding) == 1536:
-            valid_embeddings += 1
-        else:
-            missing_embeddings += 1
-            if i < 3:  # Show first few problematic entries
-                print(f"Entry {i} ({entry.get('pair_id')}): embedding length = {len(embedding)}")
+    for i in np.flatnonzero(~valid_mask[:3]):  # Show first few problematic entries
+        print(f"Entry {i} ({pair_ids[i]}): embedding length = {lengths[i]}")
     
     print(f"\nValid embeddings (length=1536): {valid_embeddings}")
     print(f"Invalid/missing embeddings: {missing_embeddings}")
-    print(f"Validity rate: {(valid_embeddings/len(entries)*100):.1f}%")
+    print(f"Validity rate: {(valid_embeddings/total_entries*100):.1f}%")
     
-    if valid_embeddings == len(entries):
+    if valid_embeddings == total_entries:
         print("\n✅ All embeddings are valid!")
+        if "--export-npy" in sys.argv and sidecar is None:
+            shape = export_embedding_array(data)
+            print(f"Wrote array sidecar: {EMBEDDING_ARRAY_FILE} {shape}")
     else:
         print(f"\n⚠️  {missing_embeddings} entries have invalid embeddings")
     
@@ -78,7 +196,7 @@ def check_embeddings():
     print("Recommendation:")
     print("=" * 60)
     
-    if valid_embeddings < len(entries):
+    if valid_embeddings < total_entries:
         print("⚠️  Some embeddings are corrupted or missing.")
         print("Try clearing the embeddings file and re-indexing:")
         print("  1. Delete: app-text-gen/embeddings/conversation_embeddings.json")
@@ -91,5 +209,8 @@ def check_embeddings():
         print("     text-embedding-3-small - it has lower avg similarity")
 
 if __name__ == "__main__":
-    check_embeddings()
+    if "--quick" in sys.argv:
+        quick_check_embeddings()
+    else:
+        check_embeddings()
 
@@ -1,12 +1,18 @@
+import asyncio
 import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
-from config import GITHUB_TOKEN, GITHUB_MODELS_ENDPOINT, AVAILABLE_MODELS, DEFAULT_MODEL
+from openai import AsyncOpenAI, OpenAI
+from config import GITHUB_TOKEN, GITHUB_MODELS_ENDPOINT, MODEL_DESCRIPTIONS, DEFAULT_MODEL
 from github_models_api import get_available_models
 from conversation_manager import save_conversation, load_conversation, display_saved_conversations, delete_conversation
 from profile_manager import (
-    load_profile, save_profile, create_default_profile, list_profiles,
+    load_profile, save_profile, create_default_profile, list_profiles, profile_exists,
     display_profiles, apply_profile_settings, update_profile_settings
 )
 from prompt_templates import (
@@ -24,55 +30,147 @@ from conversation_export import interactive_export
 from model_parameters import ModelParameters, display_parameter_presets, apply_preset
 from conversation_analysis import interactive_analysis
 from batch_processing import interactive_batch_processor, process_batch_job, list_batch_jobs
-from usage_stats import record_request, interactive_stats_menu
-from semantic_search import EmbeddingIndex, interactive_semantic_search, display_search_results
-from rag import RAGEngine, interactive_rag_settings
-from kb_manager import KnowledgeBase, interactive_kb_menu
-from image_generator import ImageGenerator, interactive_image_generator
+from usage_stats import record_request, interactive_stats_menu, count_tokens, count_system_prompt_tokens
 
 load_dotenv()
 
 # Initialize model parameters
 model_params = ModelParameters()
 
-# Initialize embedding index for semantic search
-try:
-    embedding_index = EmbeddingIndex()
-    semantic_search_available = True
-except Exception as e:
-    print(f"Warning: Semantic search not available: {e}")
-    embedding_index = None
-    semantic_search_available = False
-
-# Initialize RAG engine
-try:
-    rag_engine = RAGEngine(embedding_index)
-    # Enable RAG by default if available
-    if embedding_index:
-        rag_engine.enable()
-except Exception as e:
-    print(f"Warning: RAG engine not available: {e}")
-    rag_engine = None
-
-# Initialize Knowledge Base
-try:
-    knowledge_base = KnowledgeBase()
-except Exception as e:
-    print(f"Warning: Knowledge Base not available: {e}")
-    knowledge_base = None
-
-# Initialize Image Generator
-try:
-    image_generator = ImageGenerator()
-    image_generation_available = True
-except Exception as e:
-    print(f"Warning: Image generation not available: {e}")
-    image_generator = None
-    image_generation_available = False
+# Semantic search, RAG, the knowledge base and image generation pull in heavy
+# dependencies (numpy, Azure clients), so they are created on first use
+embedding_index = None
+semantic_search_available = None
+rag_engine = None
+rag_engine_loaded = False
+knowledge_base = None
+knowledge_base_loaded = False
+image_generator = None
+image_generation_available = None
+
+def get_embedding_index():
+    """Initialize the embedding index for semantic search on first use"""
+    global embedding_index, semantic_search_available
+    
+    if semantic_search_available is None:
+        try:
+            from semantic_search import EmbeddingIndex
+            embedding_index = EmbeddingIndex()
+            semantic_search_available = True
+        except Exception as e:
+            print(f"Warning: Semantic search not available: {e}")
+            embedding_index = None
+            semantic_search_available = False
+    return embedding_index
+
+def get_rag_engine():
+    """Initialize the RAG engine on first use"""
+    global rag_engine, rag_engine_loaded
+    
+    if not rag_engine_loaded:
+        rag_engine_loaded = True
+        try:
+            from rag import RAGEngine
+            index = get_embedding_index()
+            rag_engine = RAGEngine(index)
+            # Enable RAG by default if available
+            if index:
+                rag_engine.enable()
+        except Exception as e:
+            print(f"Warning: RAG engine not available: {e}")
+            rag_engine = None
+    return rag_engine
+
+def get_knowledge_base():
+    """Initialize the Knowledge Base on first use"""
+    global knowledge_base, knowledge_base_loaded
+    
+    if not knowledge_base_loaded:
+        knowledge_base_loaded = True
+        try:
+            from kb_manager import KnowledgeBase
+            knowledge_base = KnowledgeBase()
+        except Exception as e:
+            print(f"Warning: Knowledge Base not available: {e}")
+            knowledge_base = None
+    return knowledge_base
+
+def get_image_generator():
+    """Initialize the Image Generator on first use"""
+    global image_generator, image_generation_available
+    
+    if image_generation_available is None:
+        try:
+            from image_generator import ImageGenerator
+            image_generator = ImageGenerator()
+            image_generation_available = True
+        except Exception as e:
+            print(f"Warning: Image generation not available: {e}")
+            image_generator = None
+            image_generation_available = False
+    return image_generator
+
+# Shared client so every request reuses the same keep-alive connection pool
+client = OpenAI(
+    api_key=GITHUB_TOKEN,
+    base_url=GITHUB_MODELS_ENDPOINT,
+    http_client=httpx.Client(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    )
+)
+
+# Streamed text is written in batches of deltas that start small (fast first token)
+# and grow geometrically, but never wait longer than the flush interval
+STREAM_FLUSH_SECONDS = int(os.getenv("STREAM_FLUSH_MS", "50")) / 1000
+STREAM_MIN_BATCH = int(os.getenv("STREAM_MIN_BATCH", "1"))
+STREAM_BATCH_GROWTH = int(os.getenv("STREAM_BATCH_GROWTH", "3"))
+STREAM_MAX_BATCH = int(os.getenv("STREAM_MAX_BATCH", "50"))
+
+# Each completed exchange is embedded in the background while the user types the next prompt
+AUTO_INDEX_EMBEDDINGS = os.getenv("AUTO_INDEX_EMBEDDINGS", "true").lower() == "true"
+background_executor = ThreadPoolExecutor(max_workers=1)
+
+# RAG retrieval runs here so it overlaps preparing the history window for the request
+retrieval_executor = ThreadPoolExecutor(max_workers=1)
+
+# Template and batch job listings are read ahead in the background and refreshed after writes.
+# They get their own workers so a prefetch never waits behind embedding an exchange.
+prefetched_listings = {}
+listing_executor = ThreadPoolExecutor(max_workers=2)
+
+def prefetch_listing(loader):
+    """Start reading a listing in the background so the next menu can show it immediately"""
+    prefetched_listings[loader] = listing_executor.submit(loader)
+
+def get_listing(loader):
+    """Return a prefetched listing if it is ready soon, otherwise read it now"""
+    future = prefetched_listings.pop(loader, None)
+    listing = None
+    if future is not None:
+        try:
+            listing = future.result(timeout=0.5)
+        except Exception:
+            # A prefetch that has not started yet is dropped instead of running alongside this read
+            future.cancel()
+            listing = None
+    if listing is None:
+        listing = loader()
+    prefetch_listing(loader)
+    return listing
+session_conversation_id = None
 
 # Conversation history storage
 conversation_history = []
 
+# Only the most recent turns are sent verbatim; older ones are folded into a summary
+HISTORY_WINDOW_TURNS = int(os.getenv("HISTORY_WINDOW_TURNS", "8"))
+# Token budget for the verbatim messages; the oldest are dropped first when it is exceeded
+HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", "3000"))
+# The history command lists at most this many of the latest messages
+HISTORY_DISPLAY_LIMIT = 50
+conversation_summary = ""
+summarized_count = 0
+
 # System prompt/custom instructions
 system_prompt = "You are a helpful assistant."
 DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
@@ -88,14 +186,166 @@ profile_name = "default"
 last_response = None
 last_prompt = None
 
-def generate_text_streaming(prompt, model_name):
-    """Generate text using GitHub Models with streaming output and conversation context"""
-    global last_response, last_prompt, rag_engine
+# Matches {placeholder} fields in prompt templates
+PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}')
+
+# Maximum number of batch prompts in flight at once
+BATCH_CONCURRENCY = int(os.getenv("OPENAI_NUM_PARALLEL", "8"))
+
+# Async client for batch jobs, bound to the event loop that created it
+async_client = None
+async_client_loop = None
+
+def get_async_client():
+    """Return an AsyncOpenAI client for the running event loop"""
+    global async_client, async_client_loop
+    
+    loop = asyncio.get_running_loop()
+    if async_client is None or async_client_loop is not loop:
+        async_client = AsyncOpenAI(
+            api_key=GITHUB_TOKEN,
+            base_url=GITHUB_MODELS_ENDPOINT
+        )
+        async_client_loop = loop
+    return async_client
+
+async def aclose_async_client():
+    """Close the batch client before its event loop ends, releasing its connection pool"""
+    global async_client, async_client_loop
+    
+    if async_client is not None:
+        await async_client.close()
+    async_client = None
+    async_client_loop = None
+
+async def agenerate_text_streaming(prompt, model_name, job_system_prompt=None):
+    """Generate text for a single batch prompt without touching the conversation history"""
+    client = get_async_client()
+    batch_system_prompt = job_system_prompt or system_prompt
+    params = model_params.get_all_parameters()
+    
+    response = await client.chat.completions.create(
+        model=model_name,
+        messages=[
+            {"role": "system", "content": batch_system_prompt},
+            {"role": "user", "content": prompt}
+        ],
+        **params,
+        stream=True
+    )
+    
+    parts = []
+    async for chunk in response:
+        try:
+            content = chunk.choices[0].delta.content
+        except (AttributeError, IndexError, TypeError):
+            continue
+        if content:
+            parts.append(content)
+    full_response = "".join(parts)
+    
+    # Record usage statistics
+    prompt_tokens = count_tokens(prompt) + count_system_prompt_tokens(batch_system_prompt)
+    completion_tokens = count_tokens(full_response)
+    record_request(model_name, prompt_tokens, completion_tokens, batch_system_prompt)
+    
+    return full_response
+
+def reset_conversation_context():
+    """Forget the running summary and auto-index id of the current conversation"""
+    global conversation_summary, summarized_count, session_conversation_id
+    conversation_summary = ""
+    summarized_count = 0
+    # Later exchanges start a new auto-indexed conversation
+    session_conversation_id = None
+
+def trim_history(messages, max_tokens=HISTORY_MAX_TOKENS):
+    """Keep the newest messages that fit in the token budget (always at least the latest one)"""
+    total = 0
+    start = len(messages)
+    while start > 0:
+        total += count_tokens(messages[start - 1]["content"])
+        if total > max_tokens and start < len(messages):
+            break
+        start -= 1
+    return messages[start:]
+
+def get_context_messages(model_name):
+    """Return the recent messages to send, summarizing older ones once a full window overflows"""
+    global conversation_summary, summarized_count
+    
+    window = 2 * HISTORY_WINDOW_TURNS
+    overflow_end = len(conversation_history) - window
+    
+    if overflow_end - summarized_count >= window:
+        transcript = "\n".join(
+            f"{message['role']}: {message['content']}"
+            for message in conversation_history[summarized_count:overflow_end]
+        )
+        if conversation_summary:
+            transcript = f"Earlier summary: {conversation_summary}\n\n{transcript}"
+        
+        try:
+            response = client.chat.completions.create(
+                model=model_name,
+                messages=[
+                    {"role": "system", "content": "Summarize this conversation succinctly, keeping any facts, names and decisions needed to continue it."},
+                    {"role": "user", "content": transcript}
+                ],
+                max_tokens=300
+            )
+            conversation_summary = response.choices[0].message.content or conversation_summary
+            summarized_count = overflow_end
+        except Exception as e:
+            print(f"Warning: Could not summarize older messages: {e}")
     
-    client = OpenAI(
-        api_key=GITHUB_TOKEN,
-        base_url=GITHUB_MODELS_ENDPOINT
+    return trim_history(conversation_history[summarized_count:])
+
+def index_exchange(conversation_id, pair_index, prompt, response, exchange_system_prompt, model_name):
+    """Index one exchange from the background executor, reporting failures"""
+    try:
+        embedding_index.index_message_pair(
+            conversation_id, pair_index, prompt, response, exchange_system_prompt, model_name
+        )
+    except Exception as e:
+        print(f"\nWarning: Background indexing failed: {e}")
+
+def schedule_exchange_indexing(prompt, response, model_name):
+    """Queue the latest exchange for embedding if auto-indexing is available"""
+    global session_conversation_id
+    
+    if not AUTO_INDEX_EMBEDDINGS or get_embedding_index() is None:
+        return
+    
+    if session_conversation_id is None:
+        session_conversation_id = f"conv_{model_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    # Match the pair numbering used by EmbeddingIndex.index_conversation
+    pair_index = sum(1 for message in conversation_history if message["role"] == "assistant") - 1
+    background_executor.submit(
+        index_exchange, session_conversation_id, pair_index, prompt, response, system_prompt, model_name
     )
+
+def get_stream_writer():
+    """Return write/flush functions for streamed text, skipping TextIO encoding on UTF-8 terminals"""
+    stdout = sys.stdout
+    buffer = getattr(stdout, "buffer", None)
+    encoding = (getattr(stdout, "encoding", None) or "").lower().replace("-", "")
+    
+    if buffer is None or encoding != "utf8":
+        return stdout.write, stdout.flush
+    
+    # Push any pending text output ahead of the raw bytes
+    stdout.flush()
+    
+    def write_utf8(text):
+        buffer.write(text.encode("utf-8"))
+    
+    return write_utf8, buffer.flush
+
+def generate_text_streaming(prompt, model_name):
+    """Generate text using GitHub Models with streaming output and conversation context"""
+    global last_response, last_prompt
     
     # Track prompt for feedback
     last_prompt = prompt
@@ -106,50 +356,77 @@ def generate_text_streaming(prompt, model_name):
         "content": prompt
     })
     
-    # Retrieve context if RAG is enabled
-    context_results = []
-    augmented_system_prompt = system_prompt
+    # Retrieve context if RAG is enabled, while the history window (and any summary) is prepared
+    retrieval = None
+    context_message = None
+    rag_engine = get_rag_engine()
     if rag_engine and rag_engine.enabled:
-        context_results, avg_similarity = rag_engine.retrieve_context(prompt)
+        retrieval = retrieval_executor.submit(rag_engine.retrieve_context, prompt)
+    
+    context_messages = get_context_messages(model_name)
+    
+    if retrieval is not None:
+        context_results, avg_similarity = retrieval.result()
         if context_results:
-            augmented_system_prompt = rag_engine.get_augmented_system_prompt(
-                system_prompt, context_results
-            )
+            context_message = rag_engine.get_context_message(context_results)
             rag_engine.display_context_info(context_results, prompt)
     
+    # The system prompt stays byte-identical across turns so providers can cache the prefix;
+    # the summary and retrieved context go in separate messages after it
+    injected_messages = []
+    messages = [{"role": "system", "content": system_prompt}]
+    if conversation_summary:
+        summary_message = {"role": "user", "content": f"<summary>Prior conversation: {conversation_summary}</summary>"}
+        injected_messages.append(summary_message)
+        messages.append(summary_message)
+    messages.extend(context_messages[:-1])  # Recent turns; older ones are in the summary
+    if context_message:
+        injected_messages.append(context_message)
+        messages.append(context_message)
+    messages.append(context_messages[-1])  # The current prompt
+    
+    params = model_params.get_all_parameters()
+    injected_tokens = sum(count_tokens(message["content"]) for message in injected_messages)
+    
     try:
         # Use stream=True to get streaming response
-        params = model_params.get_all_parameters()
         response = client.chat.completions.create(
             model=model_name,
-            messages=[
-                {"role": "system", "content": augmented_system_prompt},
-                *conversation_history  # Include full conversation history
-            ],
-            temperature=params['temperature'],
-            max_tokens=params['max_tokens'],
-            top_p=params['top_p'],
-            frequency_penalty=params['frequency_penalty'],
-            presence_penalty=params['presence_penalty'],
+            messages=messages,
+            **params,
             stream=True  # Enable streaming
         )
         
-        full_response = ""
+        parts = []
+        pending = []
+        batch_size = STREAM_MIN_BATCH
+        last_flush = time.monotonic()
+        write, flush = get_stream_writer()
         for chunk in response:
             try:
-                # Safely check for content
-                if (chunk.choices and 
-                    len(chunk.choices) > 0 and 
-                    chunk.choices[0].delta and 
-                    chunk.choices[0].delta.content):
-                    content = chunk.choices[0].delta.content
-                    print(content, end="", flush=True)
-                    full_response += content
+                content = chunk.choices[0].delta.content
             except (AttributeError, IndexError, TypeError):
-                # Skip chunks without content
+                # Skip chunks without choices or a delta
+                continue
+            if not content:
                 continue
+            
+            parts.append(content)
+            pending.append(content)
+            
+            # Coalesce deltas into fewer writes and flushes
+            now = time.monotonic()
+            if len(pending) >= batch_size or now - last_flush >= STREAM_FLUSH_SECONDS:
+                write("".join(pending))
+                flush()
+                pending.clear()
+                batch_size = min(batch_size * STREAM_BATCH_GROWTH, STREAM_MAX_BATCH)
+                last_flush = now
         
+        write("".join(pending))
+        flush()
         print()  # New line at the end
+        full_response = "".join(parts)
         
         # Add assistant response to conversation history
         conversation_history.append({
@@ -159,29 +436,22 @@ def generate_text_streaming(prompt, model_name):
         
         # Track response for feedback
         last_response = full_response
+        schedule_exchange_indexing(prompt, full_response, model_name)
         
-        # Record usage statistics (rough token estimate)
-        prompt_tokens = len(prompt.split()) + len(augmented_system_prompt.split())
-        completion_tokens = len(full_response.split())
-        record_request(model_name, prompt_tokens, completion_tokens, augmented_system_prompt)
+        # Record usage statistics
+        prompt_tokens = count_tokens(prompt) + count_system_prompt_tokens(system_prompt) + injected_tokens
+        completion_tokens = count_tokens(full_response)
+        record_request(model_name, prompt_tokens, completion_tokens, system_prompt)
         
         return full_response
         
     except Exception as e:
         # Fallback to non-streaming if streaming fails
         print(f"(Streaming unavailable, using standard response)\n")
-        params = model_params.get_all_parameters()
         response = client.chat.completions.create(
             model=model_name,
-            messages=[
-                {"role": "system", "content": augmented_system_prompt},
-                *conversation_history
-            ],
-            temperature=params['temperature'],
-            max_tokens=params['max_tokens'],
-            top_p=params['top_p'],
-            frequency_penalty=params['frequency_penalty'],
-            presence_penalty=params['presence_penalty']
+            messages=messages,
+            **params
         )
         result = response.choices[0].message.content
         print(result)
@@ -194,10 +464,11 @@ def generate_text_streaming(prompt, model_name):
         
         # Track response for feedback
         last_response = result
+        schedule_exchange_indexing(prompt, result, model_name)
         
-        # Record usage statistics (rough token estimate)
-        prompt_tokens = len(prompt.split()) + len(system_prompt.split())
-        completion_tokens = len(result.split())
+        # Record usage statistics
+        prompt_tokens = count_tokens(prompt) + count_system_prompt_tokens(system_prompt) + injected_tokens
+        completion_tokens = count_tokens(result)
         record_request(model_name, prompt_tokens, completion_tokens, system_prompt)
         
         return result
@@ -212,12 +483,8 @@ def display_model_options(available_models):
     
     for choice_num, model_name in enumerate(available_models, 1):
         model_mapping[str(choice_num)] = model_name
-        # Check if model is in our predefined list for description
-        description = "GitHub Model"
-        for key, model_info in AVAILABLE_MODELS.items():
-            if model_info["name"] == model_name:
-                description = model_info["description"]
-                break
+        # Use the predefined description if this is a known model
+        description = MODEL_DESCRIPTIONS.get(model_name, "GitHub Model")
         print(f"{choice_num}. {model_name}")
         print(f"   {description}")
     
@@ -258,22 +525,24 @@ def display_conversation_history():
         print("\nNo conversation history yet.")
         return
     
-    print("\n" + "=" * 60)
-    print("Conversation History:")
-    print("=" * 60)
-    for i, message in enumerate(conversation_history, 1):
-        role = message["role"].upper()
+    # Only the most recent messages are shown; numbering stays relative to the full history
+    start = max(len(conversation_history) - HISTORY_DISPLAY_LIMIT, 0)
+    lines = ["\n" + "=" * 60, "Conversation History:", "=" * 60]
+    if start:
+        lines.append(f"({start} earlier messages not shown)")
+    for i in range(start, len(conversation_history)):
+        message = conversation_history[i]
         content = message["content"]
         # Truncate long messages for display
-        if len(content) > 100:
-            content = content[:100] + "..."
-        print(f"{i}. [{role}]: {content}")
-    print("=" * 60)
+        ellipsis = "..." if len(content) > 100 else ""
+        lines.append(f"{i + 1}. [{message['role'].upper()}]: {content[:100]}{ellipsis}")
+    lines.append("=" * 60)
+    print("\n".join(lines))
 
 def clear_conversation_history():
     """Clear the conversation history"""
-    global conversation_history
-    conversation_history = []
+    conversation_history.clear()
+    reset_conversation_context()
     print("Conversation history cleared.")
 
 def set_system_prompt():
@@ -329,7 +598,7 @@ def save_current_conversation():
 
 def load_saved_conversation():
     """Load a saved conversation"""
-    global conversation_history, system_prompt
+    global system_prompt
     
     files = display_saved_conversations()
     if not files:
@@ -347,7 +616,8 @@ def load_saved_conversation():
             messages, prompt, model = load_conversation(filename)
             
             if messages is not None:
-                conversation_history = messages
+                conversation_history[:] = messages
+                reset_conversation_context()
                 system_prompt = prompt
                 print(f"\nLoaded conversation with {len(messages)} messages")
                 print(f"System prompt: {system_prompt}")
@@ -439,7 +709,7 @@ def save_current_profile():
             print("Invalid profile name. Profile not saved.")
             return
         
-        if new_name in list_profiles():
+        if profile_exists(new_name):
             overwrite = input(f"Profile '{new_name}' already exists. Overwrite? (y/n): ").strip().lower()
             if overwrite != 'y':
                 print("Profile not saved.")
@@ -480,7 +750,7 @@ def create_new_profile():
         print("Invalid profile name.")
         return
     
-    if new_name in list_profiles():
+    if profile_exists(new_name):
         print(f"Profile '{new_name}' already exists.")
         return
     
@@ -500,7 +770,7 @@ def use_prompt_template():
     """Use a prompt template to generate a prompt"""
     global system_prompt
     
-    template_list = display_templates()
+    template_list = display_templates(get_listing(list_all_templates))
     
     if not template_list:
         return
@@ -565,14 +835,14 @@ def create_custom_template():
         return
     
     # Extract placeholders from template
-    import re
-    placeholders = re.findall(r'\{(\w+)\}', template)
+    placeholders = PLACEHOLDER_PATTERN.findall(template)
     
     if placeholders:
         print(f"\nDetected placeholders: {', '.join(placeholders)}")
     
     try:
         save_custom_template(name, description, system_prompt_input, template, placeholders)
+        prefetch_listing(list_all_templates)
         print(f"\nTemplate '{name}' created successfully!")
     except Exception as e:
         print(f"Error creating template: {e}")
@@ -621,10 +891,11 @@ def analyze_conversation():
 def batch_process():
     """Process batch jobs"""
     interactive_batch_processor()
+    prefetch_listing(list_batch_jobs)
 
 def run_batch_job():
     """Run/execute a batch job"""
-    jobs = list_batch_jobs()
+    jobs = get_listing(list_batch_jobs)
     
     if not jobs:
         print("\nNo batch jobs available.")
@@ -650,7 +921,11 @@ def run_batch_job():
         job_idx = int(choice) - 1
         if 0 <= job_idx < len(jobs):
             job_name = jobs[job_idx]['name']
-            process_batch_job(job_name, generate_text_streaming, model_params)
+            process_batch_job(
+                job_name, agenerate_text_streaming, model_params, BATCH_CONCURRENCY,
+                cleanup_function=aclose_async_client
+            )
+            prefetch_listing(list_batch_jobs)
         else:
             print("Invalid choice.")
     
@@ -665,20 +940,22 @@ def view_usage_stats():
 
 def semantic_search():
     """Perform semantic search on conversations"""
-    global embedding_index
+    embedding_index = get_embedding_index()
     
-    if not semantic_search_available or embedding_index is None:
+    if embedding_index is None:
         print("\n❌ Semantic search is not available.")
         print("Please ensure Azure OpenAI credentials are configured in .env")
         return
     
+    from semantic_search import interactive_semantic_search
     interactive_semantic_search(embedding_index)
 
 def index_conversation_embeddings():
     """Index the current conversation with embeddings"""
-    global embedding_index, conversation_history, system_prompt, current_model
+    global conversation_history, system_prompt, current_model, session_conversation_id
     
-    if not semantic_search_available or embedding_index is None:
+    embedding_index = get_embedding_index()
+    if embedding_index is None:
         print("\n❌ Embedding indexing is not available.")
         return
     
@@ -686,8 +963,10 @@ def index_conversation_embeddings():
         print("\nNo conversation to index.")
         return
     
-    # Generate a conversation ID based on timestamp and model
-    conversation_id = f"conv_{current_model}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    # Reuse the session's ID so these entries replace the ones indexed turn by turn
+    if session_conversation_id is None:
+        session_conversation_id = f"conv_{current_model}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    conversation_id = session_conversation_id
     
     proceed = input(f"\nIndex current conversation as '{conversation_id}'? (y/n): ").strip().lower()
     if proceed != 'y':
@@ -706,9 +985,9 @@ def index_conversation_embeddings():
 
 def view_embedding_stats():
     """View embedding index statistics"""
-    global embedding_index
+    embedding_index = get_embedding_index()
     
-    if not semantic_search_available or embedding_index is None:
+    if embedding_index is None:
         print("\n❌ Semantic search is not available.")
         return
     
@@ -783,6 +1062,103 @@ def manage_model_parameters():
         else:
             print("Invalid choice.")
 
+def index_kb_documents():
+    """Index Knowledge Base documents with embeddings"""
+    embedding_index = get_embedding_index()
+    knowledge_base = get_knowledge_base()
+    if embedding_index and knowledge_base:
+        print("\nIndexing Knowledge Base documents...")
+        embedding_index.index_kb_documents(knowledge_base)
+    else:
+        print("Error: Embeddings or KB not available")
+
+def search_kb_documents():
+    """Search Knowledge Base documents"""
+    embedding_index = get_embedding_index()
+    if embedding_index:
+        print("\n" + "="*60)
+        print("Knowledge Base Search")
+        print("="*60)
+        query = input("\nEnter search query: ").strip()
+        if query:
+            results = embedding_index.search_kb_only(query, top_k=5, similarity_threshold=0.15)
+            if results:
+                print(f"\nFound {len(results)} KB results:")
+                for i, r in enumerate(results, 1):
+                    sim_pct = r['similarity_score'] * 100
+                    print(f"\n{i}. Relevance: {sim_pct:.1f}%")
+                    print(f"   Document: {r.get('doc_title', 'Unknown')}")
+                    print(f"   Collection: {r.get('collection', 'Unknown')}")
+                    print(f"   Text: {r.get('text', '')[:200]}...")
+            else:
+                print("No KB results found for this query")
+    else:
+        print("Error: Embeddings not available")
+
+def manage_rag_settings():
+    """Configure RAG settings"""
+    rag_engine = get_rag_engine()
+    if rag_engine:
+        from rag import interactive_rag_settings
+        interactive_rag_settings(rag_engine)
+    else:
+        print("RAG engine not available")
+
+def manage_knowledge_base():
+    """Manage knowledge base documents"""
+    knowledge_base = get_knowledge_base()
+    if knowledge_base:
+        from kb_manager import interactive_kb_menu
+        interactive_kb_menu(knowledge_base)
+    else:
+        print("Knowledge Base not available")
+
+def generate_images():
+    """Generate images with DALL-E 3"""
+    image_generator = get_image_generator()
+    if image_generator:
+        from image_generator import interactive_image_generator
+        interactive_image_generator(image_generator)
+    else:
+        print("Image generation not available")
+
+EXIT_COMMANDS = frozenset({'exit', 'quit'})
+
+# Command name -> handler; 'model' and the exit commands are handled in main()
+COMMANDS = {
+    'system': set_system_prompt,
+    'prompt': display_system_prompt,
+    'history': display_conversation_history,
+    'clear': clear_conversation_history,
+    'save': save_current_conversation,
+    'load': load_saved_conversation,
+    'profile': select_profile,
+    'new-profile': create_new_profile,
+    'save-profile': save_current_profile,
+    'profiles': display_profiles,
+    'profile-info': view_profile_details,
+    'template': use_prompt_template,
+    'create-template': create_custom_template,
+    'rate': rate_last_response,
+    'feedback-stats': view_feedback_stats,
+    'flagged': view_flagged_responses,
+    'search': search_conversations,
+    'semantic-search': semantic_search,
+    'index': index_conversation_embeddings,
+    'index-kb': index_kb_documents,
+    'kb-search': search_kb_documents,
+    'embedding-stats': view_embedding_stats,
+    'export': export_conversation,
+    'analyze': analyze_conversation,
+    'batch': batch_process,
+    'batch-run': run_batch_job,
+    'stats': view_usage_stats,
+    'params': manage_model_parameters,
+    'rag': manage_rag_settings,
+    'kb': manage_knowledge_base,
+    'image': generate_images,
+}
+
 def main():
     """Main interactive loop for the text generation app"""
     global current_model, current_profile, profile_name
@@ -792,6 +1168,10 @@ def main():
     print("=" * 60)
     print("\nLoading user profile...")
     
+    # Read menu listings in the background while the profile loads
+    prefetch_listing(list_all_templates)
+    prefetch_listing(list_batch_jobs)
+    
     # Load user profile (automatically sets current_model and system_prompt from profile)
     select_profile()
     
@@ -845,164 +1225,19 @@ def main():
             user_input = input("\nEnter your prompt (or command): ").strip()
             
             # Check for commands
-            if user_input.lower() in ['exit', 'quit']:
+            command = user_input.lower()
+            
+            if command in EXIT_COMMANDS:
                 print("\nThank you for using the Text Generation App. Goodbye!")
                 break
             
-            if user_input.lower() == 'model':
+            if command == 'model':
                 current_model = select_model(available_models)
                 continue
             
-            if user_input.lower() == 'system':
-                set_system_prompt()
-                continue
-            
-            if user_input.lower() == 'prompt':
-                display_system_prompt()
-                continue
-            
-            if user_input.lower() == 'history':
-                display_conversation_history()
-                continue
-            
-            if user_input.lower() == 'clear':
-                clear_conversation_history()
-                continue
-            
-            if user_input.lower() == 'save':
-                save_current_conversation()
-                continue
-            
-            if user_input.lower() == 'load':
-                load_saved_conversation()
-                continue
-            
-            if user_input.lower() == 'profile':
-                select_profile()
-                continue
-            
-            if user_input.lower() == 'new-profile':
-                create_new_profile()
-                continue
-            
-            if user_input.lower() == 'save-profile':
-                save_current_profile()
-                continue
-            
-            if user_input.lower() == 'profiles':
-                display_profiles()
-                continue
-            
-            if user_input.lower() == 'profile-info':
-                view_profile_details()
-                continue
-            
-            if user_input.lower() == 'template':
-                use_prompt_template()
-                continue
-            
-            if user_input.lower() == 'create-template':
-                create_custom_template()
-                continue
-            
-            if user_input.lower() == 'rate':
-                rate_last_response()
-                continue
-            
-            if user_input.lower() == 'feedback-stats':
-                view_feedback_stats()
-                continue
-            
-            if user_input.lower() == 'flagged':
-                view_flagged_responses()
-                continue
-            
-            if user_input.lower() == 'search':
-                search_conversations()
-                continue
-            
-            if user_input.lower() == 'semantic-search':
-                semantic_search()
-                continue
-            
-            if user_input.lower() == 'index':
-                index_conversation_embeddings()
-                continue
-            
-            if user_input.lower() == 'index-kb':
-                if embedding_index and knowledge_base:
-                    print("\nIndexing Knowledge Base documents...")
-                    embedding_index.index_kb_documents(knowledge_base)
-                else:
-                    print("Error: Embeddings or KB not available")
-                continue
-            
-            if user_input.lower() == 'kb-search':
-                if embedding_index:
-                    print("\n" + "="*60)
-                    print("Knowledge Base Search")
-                    print("="*60)
-                    query = input("\nEnter search query: ").strip()
-                    if query:
-                        results = embedding_index.search_kb_only(query, top_k=5, similarity_threshold=0.15)
-                        if results:
-                            print(f"\nFound {len(results)} KB results:")
-                            for i, r in enumerate(results, 1):
-                                sim_pct = r['similarity_score'] * 100
-                                print(f"\n{i}. Relevance: {sim_pct:.1f}%")
-                                print(f"   Document: {r.get('doc_title', 'Unknown')}")
-                                print(f"   Collection: {r.get('collection', 'Unknown')}")
-                                print(f"   Text: {r.get('text', '')[:200]}...")
-                        else:
-                            print("No KB results found for this query")
-                else:
-                    print("Error: Embeddings not available")
-                continue
-            
-            if user_input.lower() == 'embedding-stats':
-                view_embedding_stats()
-                continue
-            
-            if user_input.lower() == 'export':
-                export_conversation()
-                continue
-            
-            if user_input.lower() == 'analyze':
-                analyze_conversation()
-                continue
-            
-            if user_input.lower() == 'batch':
-                batch_process()
-                continue
-            
-            if user_input.lower() == 'batch-run':
-                run_batch_job()
-                continue
-            
-            if user_input.lower() == 'stats':
-                view_usage_stats()
-                continue
-            
-            if user_input.lower() == 'params':
-                manage_model_parameters()
-                continue
-            
-            if user_input.lower() == 'rag':
-                interactive_rag_settings(rag_engine)
-                continue
-            
-            if user_input.lower() == 'kb':
-                if knowledge_base:
-                    interactive_kb_menu(knowledge_base)
-                else:
-                    print("Knowledge Base not available")
-                continue
-            
-            if user_input.lower() == 'image':
-                if image_generator:
-                    interactive_image_generator(image_generator)
-                else:
-                    print("Image generation not available")
+            handler = COMMANDS.get(command)
+            if handler:
+                handler()
                 continue
             
             # Validate input
@@ -1021,6 +1256,11 @@ def main():
         except Exception as e:
             print(f"An error occurred: {e}")
             print("Please try again.\n")
+    
+    retrieval_executor.shutdown(wait=True)
+    listing_executor.shutdown(wait=True)
+    background_executor.shutdown(wait=True)
+    client.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
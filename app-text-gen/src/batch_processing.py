@@ -1,13 +1,35 @@
 """
 Batch processing functionality for multiple prompts
 """
+import asyncio
 import json
 import os
 import csv
+import threading
 from datetime import datetime
+import json_utils
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 BATCH_DIR = "batch_jobs"
 RESULTS_DIR = "batch_results"
+# Prompt results are appended to a per-job JSONL log and folded into the job JSON
+# every BATCH_COMPACT_EVERY results and when a run finishes; only those folds are fsynced
+BATCH_COMPACT_EVERY = 50
+# Buffer size for reading prompt files and writing CSV exports
+FILE_BUFFER_SIZE = 1 << 20
+# Job summaries (name, model, created_at, statistics) for listing without opening each job file.
+# One JSON line per update, the last line for a job wins; statistics reflect the job JSON, not its result log.
+BATCH_INDEX_FILE = os.path.join(BATCH_DIR, "_index.jsonl")
+# Listings may be prefetched from a worker thread, so appends to and rewrites of the index hold this lock
+_index_lock = threading.Lock()
+
+_response_logs = {}
+_uncompacted_counts = {}
+# Job data and prompts-by-id of jobs being processed, kept current as results arrive
+_active_jobs = {}
 
 def ensure_batch_dirs():
     """Create batch directories if they don't exist"""
@@ -16,6 +38,23 @@ def ensure_batch_dirs():
     if not os.path.exists(RESULTS_DIR):
         os.makedirs(RESULTS_DIR)
 
+def write_job_file(filename, job_data, durable=False):
+    """
+    Write job data as compact UTF-8 JSON; only exports are pretty-printed
+    
+    With durable=True the data is fsynced to a temporary file that then replaces the job file,
+    so a crash leaves either the old or the new version on disk.
+    """
+    target = filename + ".tmp" if durable else filename
+    with open(target, 'wb') as f:
+        f.write(json_utils.dumps(job_data))
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    
+    if durable:
+        os.replace(target, filename)
+
 def create_batch_job(prompts, model, system_prompt="You are a helpful assistant.", job_name=None):
     """
     Create a batch job from a list of prompts
@@ -57,11 +96,153 @@ def create_batch_job(prompts, model, system_prompt="You are a helpful assistant.
     
     filename = os.path.join(BATCH_DIR, f"{job_name}.json")
     
-    with open(filename, 'w') as f:
-        json.dump(job_data, f, indent=2)
+    write_job_file(filename, job_data)
     
+    append_index_entry(job_data)
     return filename, job_data
 
+def get_job_summary(job_data):
+    """The fields of a job kept in the batch index"""
+    return {
+        "name": job_data.get('name'),
+        "model": job_data.get('model'),
+        "created_at": job_data.get('created_at'),
+        "statistics": job_data.get('statistics', {})
+    }
+
+def append_index_entry(job_data):
+    """Record a job's current summary in the batch index"""
+    line = json.dumps(get_job_summary(job_data), separators=(',', ':')) + "\n"
+    with _index_lock:
+        if not os.path.exists(BATCH_INDEX_FILE):
+            return  # Built from the job files on the next listing
+        with open(BATCH_INDEX_FILE, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+def write_batch_index(summaries):
+    """Replace the batch index with one line per job; call with _index_lock held"""
+    temp_filename = BATCH_INDEX_FILE + ".tmp"
+    with open(temp_filename, 'w', encoding='utf-8') as f:
+        for summary in summaries:
+            f.write(json.dumps(summary, separators=(',', ':')) + "\n")
+    os.replace(temp_filename, BATCH_INDEX_FILE)
+
+def list_job_names():
+    """Names of the jobs with a file in BATCH_DIR, from the directory entries alone"""
+    names = set()
+    with os.scandir(BATCH_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json') and entry.is_file(follow_symlinks=False):
+                names.add(entry.name[:-len('.json')])
+    return names
+
+def read_job_summaries(job_names):
+    """Summaries of the named jobs, read from their job files"""
+    summaries = {}
+    for job_name in job_names:
+        try:
+            summaries[job_name] = get_job_summary(read_job_file(os.path.join(BATCH_DIR, f"{job_name}.json")))
+        except Exception as e:
+            print(f"Error reading job {job_name}.json: {e}")
+    return summaries
+
+def rebuild_batch_index():
+    """Build the batch index by reading every job file"""
+    with _index_lock:
+        summaries = list(read_job_summaries(list_job_names()).values())
+        write_batch_index(summaries)
+    return summaries
+
+def read_batch_index():
+    """
+    Latest summary of every job in the batch index, reconciled with the job files on disk
+    
+    Jobs whose file is gone are dropped and job files the index does not know are read in.
+    The index is rewritten when that changed it or when it has grown well past one line per job.
+    """
+    with _index_lock:
+        summaries = {}
+        line_count = 0
+        with open(BATCH_INDEX_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                line_count += 1
+                try:
+                    summary = json.loads(line)
+                except ValueError:
+                    continue  # Partially written last line
+                summaries[summary['name']] = summary
+        
+        job_names = list_job_names()
+        removed = summaries.keys() - job_names
+        for job_name in removed:
+            del summaries[job_name]
+        added = read_job_summaries(job_names - summaries.keys())
+        summaries.update(added)
+        
+        if removed or added or line_count > 2 * len(summaries) + BATCH_COMPACT_EVERY:
+            write_batch_index(summaries.values())
+    return list(summaries.values())
+
+def apply_logged_counts(summary):
+    """Add results still in the job's result log to a summary's statistics"""
+    responses_file = get_responses_filename(summary['name'])
+    if not os.path.exists(responses_file):
+        return summary
+    
+    stats = dict(summary['statistics'])
+    with open(responses_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                status = json.loads(line)['status']
+            except (ValueError, KeyError):
+                continue
+            stats['completed' if status == 'completed' else 'failed'] += 1
+            stats['pending'] -= 1
+    return dict(summary, statistics=stats)
+
+def read_job_file(filename):
+    """Parse a job file; listings read the batch index instead, so jobs are not cached"""
+    return json_utils.load_file(filename)
+
+def get_responses_filename(job_name):
+    """Path of the append-only result log for a batch job"""
+    return os.path.join(BATCH_DIR, f"{job_name}.responses.jsonl")
+
+def apply_result_record(prompts_by_id, stats, record):
+    """Apply one logged result to its prompt item and the job statistics"""
+    item = prompts_by_id.get(record.get('id'))
+    # Records already folded into the JSON are skipped
+    if item is None or item['status'] != 'pending':
+        return
+    
+    item['status'] = record['status']
+    if record['status'] == 'completed':
+        item['response'] = record.get('response')
+        item['timestamp'] = record.get('timestamp')
+        stats['completed'] += 1
+    else:
+        stats['failed'] += 1
+    stats['pending'] -= 1
+
+def apply_response_log(job_data):
+    """Merge results from the job's JSONL log into the loaded job data"""
+    responses_file = get_responses_filename(job_data.get('name', 'batch'))
+    if not os.path.exists(responses_file):
+        return job_data
+    
+    prompts_by_id = {item['id']: item for item in job_data['prompts']}
+    stats = job_data['statistics']
+    with open(responses_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Partially written last line
+            
+            apply_result_record(prompts_by_id, stats, record)
+    
+    return job_data
+
 def load_batch_job(job_name):
     """Load a batch job"""
     filename = os.path.join(BATCH_DIR, f"{job_name}.json")
@@ -70,64 +251,91 @@ def load_batch_job(job_name):
         return None
     
     try:
-        with open(filename, 'r') as f:
-            return json.load(f)
+        return apply_response_log(read_job_file(filename))
     except Exception as e:
         print(f"Error loading batch job: {e}")
         return None
 
-def save_batch_job(job_data):
+def save_batch_job(job_data, durable=False):
     """Save a batch job"""
     ensure_batch_dirs()
     
     job_name = job_data.get('name', 'batch')
     filename = os.path.join(BATCH_DIR, f"{job_name}.json")
     
-    with open(filename, 'w') as f:
-        json.dump(job_data, f, indent=2)
+    write_job_file(filename, job_data, durable)
     
     return filename
 
-def update_batch_response(job_name, prompt_id, response):
-    """Update a response for a prompt in a batch job"""
-    job_data = load_batch_job(job_name)
+def compact_batch_job(job_name):
+    """Fold the job's result log into its JSON file and remove the log"""
+    log_file = _response_logs.pop(job_name, None)
+    if log_file:
+        log_file.close()
+    _uncompacted_counts.pop(job_name, None)
+    
+    responses_file = get_responses_filename(job_name)
+    if not os.path.exists(responses_file):
+        return False
     
+    if job_name in _active_jobs:
+        job_data = _active_jobs[job_name][0]
+    else:
+        job_data = load_batch_job(job_name)
     if not job_data:
         return False
     
-    # Find and update the prompt
-    for prompt_item in job_data['prompts']:
-        if prompt_item['id'] == prompt_id:
-            prompt_item['status'] = 'completed'
-            prompt_item['response'] = response
-            prompt_item['timestamp'] = datetime.now().isoformat()
-            
-            # Update statistics
-            job_data['statistics']['completed'] += 1
-            job_data['statistics']['pending'] -= 1
-            
-            save_batch_job(job_data)
-            return True
-    
-    return False
+    # The log is only removed once the job file holding its results is safely on disk
+    save_batch_job(job_data, durable=True)
+    os.remove(responses_file)
+    append_index_entry(job_data)
+    return True
+
+def append_batch_result(job_name, record):
+    """Append one prompt result to the job's log, compacting it periodically"""
+    log_file = _response_logs.get(job_name)
+    if log_file is None:
+        ensure_batch_dirs()
+        log_file = open(get_responses_filename(job_name), 'a', encoding='utf-8')
+        _response_logs[job_name] = log_file
+    
+    log_file.write(json.dumps(record, separators=(',', ':')) + "\n")
+    log_file.flush()
+    
+    if job_name in _active_jobs:
+        job_data, prompts_by_id = _active_jobs[job_name]
+        apply_result_record(prompts_by_id, job_data['statistics'], record)
+    
+    _uncompacted_counts[job_name] = _uncompacted_counts.get(job_name, 0) + 1
+    if _uncompacted_counts[job_name] >= BATCH_COMPACT_EVERY:
+        compact_batch_job(job_name)
+
+def update_batch_response(job_name, prompt_id, response):
+    """Update a response for a prompt in a batch job"""
+    append_batch_result(job_name, {
+        "id": prompt_id,
+        "status": "completed",
+        "response": response,
+        "timestamp": datetime.now().isoformat()
+    })
+    return True
+
+def mark_batch_failed(job_name, prompt_id):
+    """Mark a prompt in a batch job as failed"""
+    append_batch_result(job_name, {"id": prompt_id, "status": "failed"})
+    return True
 
 def list_batch_jobs():
-    """List all batch jobs"""
+    """List summaries of all batch jobs from the batch index"""
     ensure_batch_dirs()
     
-    jobs = []
+    if os.path.exists(BATCH_INDEX_FILE):
+        summaries = read_batch_index()
+    else:
+        summaries = rebuild_batch_index()
     
-    if os.path.exists(BATCH_DIR):
-        for filename in os.listdir(BATCH_DIR):
-            if filename.endswith('.json'):
-                try:
-                    with open(os.path.join(BATCH_DIR, filename), 'r') as f:
-                        job = json.load(f)
-                        jobs.append(job)
-                except Exception as e:
-                    print(f"Error reading job {filename}: {e}")
-    
-    return sorted(jobs, key=lambda x: x.get('created_at', ''), reverse=True)
+    jobs = [apply_logged_counts(summary) for summary in summaries]
+    return sorted(jobs, key=lambda x: x.get('created_at') or '', reverse=True)
 
 def display_batch_jobs():
     """Display all batch jobs"""
@@ -173,21 +381,24 @@ def export_batch_results(job_name, format='csv'):
         filename = os.path.join(RESULTS_DIR, f"{base_name}.csv")
         
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
+            # A 1 MiB buffer turns the rows into a few large writes
+            with open(filename, 'w', newline='', encoding='utf-8', buffering=FILE_BUFFER_SIZE) as f:
                 writer = csv.writer(f)
                 
                 # Write header
                 writer.writerow(['ID', 'Status', 'Prompt', 'Response', 'Timestamp'])
                 
                 # Write data
-                for prompt_item in job_data['prompts']:
-                    writer.writerow([
+                writer.writerows(
+                    (
                         prompt_item['id'],
                         prompt_item['status'],
                         prompt_item['prompt'],
                         prompt_item.get('response', ''),
                         prompt_item.get('timestamp', '')
-                    ])
+                    )
+                    for prompt_item in job_data['prompts']
+                )
             
             return filename
         
@@ -208,52 +419,120 @@ def export_batch_results(job_name, format='csv'):
             print(f"Error exporting to JSON: {e}")
             return None
 
+def write_batch_job_streaming(prompts, model, system_prompt, job_name):
+    """
+    Write a batch job while consuming prompts from an iterable, one prompt at a time
+    
+    Returns the filename and the job data without its prompts list, or None if there were no prompts
+    """
+    ensure_batch_dirs()
+    
+    job_data = {
+        "name": job_name,
+        "created_at": datetime.now().isoformat(),
+        "model": model,
+        "system_prompt": system_prompt
+    }
+    filename = os.path.join(BATCH_DIR, f"{job_name}.json")
+    temp_filename = filename + ".tmp"
+    
+    count = 0
+    try:
+        # Compact UTF-8 JSON, the same format write_job_file produces
+        with open(temp_filename, 'wb') as f:
+            f.write(b"{")
+            for key, value in job_data.items():
+                f.write(json_utils.dumps(key) + b":" + json_utils.dumps(value) + b",")
+            f.write(b'"prompts":[')
+            for prompt in prompts:
+                item = {"id": count + 1, "prompt": prompt, "status": "pending", "response": None, "timestamp": None}
+                f.write((b"" if count == 0 else b",") + json_utils.dumps(item))
+                count += 1
+            
+            job_data["statistics"] = {"total": count, "completed": 0, "failed": 0, "pending": count}
+            f.write(b'],"statistics":' + json_utils.dumps(job_data["statistics"]) + b"}")
+    except BaseException:
+        os.remove(temp_filename)
+        raise
+    
+    if count == 0:
+        os.remove(temp_filename)
+        return None
+    
+    os.replace(temp_filename, filename)
+    append_index_entry(job_data)
+    return filename, job_data
+
+def iter_json_prompts(filepath):
+    """Yield prompts from a JSON array or a {"prompts": [...]} object"""
+    if ijson is None:
+        data = json_utils.load_file(filepath)
+        if isinstance(data, dict):
+            data = data.get('prompts', [])
+        if isinstance(data, list):
+            yield from data
+        return
+    
+    with open(filepath, 'rb', buffering=FILE_BUFFER_SIZE) as f:
+        first_char = f.read(64).lstrip()[:1]
+        f.seek(0)
+        if first_char == b'[':
+            yield from ijson.items(f, 'item')
+        elif first_char == b'{':
+            yield from ijson.items(f, 'prompts.item')
+
+def iter_text_prompts(filepath):
+    """Yield non-empty lines of a text file"""
+    with open(filepath, 'r', encoding='utf-8', buffering=FILE_BUFFER_SIZE) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+def iter_csv_prompts(filepath):
+    """Yield the first column of each CSV row after the header"""
+    with open(filepath, 'r', encoding='utf-8', newline='', buffering=FILE_BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Skip header
+        for row in reader:
+            if row:
+                yield row[0]
+
+def iter_file_prompts(filepath):
+    """Yield prompts from a JSON, TXT or CSV file, chosen by extension"""
+    if filepath.endswith('.json'):
+        return iter_json_prompts(filepath)
+    if filepath.endswith('.txt'):
+        return iter_text_prompts(filepath)
+    if filepath.endswith('.csv'):
+        return iter_csv_prompts(filepath)
+    return iter([])
+
 def create_batch_from_file(filepath, model, system_prompt="You are a helpful assistant."):
     """
     Create a batch job from a file of prompts
     
+    Prompts are streamed from the file into the job file, so the whole prompt list is never held in memory.
+    
     Args:
         filepath: Path to file containing prompts (one per line for TXT, or JSON array)
         model: Model to use
         system_prompt: System prompt
     """
-    prompts = []
+    prompts = iter_file_prompts(filepath)
+    job_name = os.path.splitext(os.path.basename(filepath))[0]
     
     try:
-        # Try JSON format first
-        if filepath.endswith('.json'):
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    prompts = data
-                elif isinstance(data, dict) and 'prompts' in data:
-                    prompts = data['prompts']
-        
-        # Try text format
-        elif filepath.endswith('.txt'):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                prompts = [line.strip() for line in f if line.strip()]
-        
-        # Try CSV format
-        elif filepath.endswith('.csv'):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                next(reader)  # Skip header
-                prompts = [row[0] for row in reader if row]
-    
+        result = write_batch_job_streaming(prompts, model, system_prompt, job_name)
     except Exception as e:
         print(f"Error reading file: {e}")
         return None
     
-    if not prompts:
+    if not result:
         print("No prompts found in file.")
         return None
     
-    # Create batch job
-    job_name = os.path.splitext(os.path.basename(filepath))[0]
-    filename, job_data = create_batch_job(prompts, model, system_prompt, job_name)
-    
-    return filename, job_data
+    return result
 
 def get_batch_statistics(job_name):
     """Get statistics for a batch job"""
@@ -270,6 +549,10 @@ def get_batch_statistics(job_name):
         'prompts_count': len(job_data.get('prompts', []))
     }
 
+def truncate_text(text, length=50):
+    """Shorten text for display, marking cut text with an ellipsis"""
+    return text if len(text) <= length else text[:length] + "..."
+
 def display_batch_job_details(job_name):
     """Display detailed information about a batch job"""
     job_data = load_batch_job(job_name)
@@ -296,25 +579,62 @@ def display_batch_job_details(job_name):
     progress_percent = (stats['completed'] / stats['total'] * 100) if stats['total'] > 0 else 0
     print(f"  Progress: {progress_percent:.1f}%")
     
+    prompts = job_data['prompts']
+    total_prompts = len(prompts)
+    
     print(f"\nPrompts:")
-    for prompt_item in job_data['prompts'][:10]:  # Show first 10
+    for prompt_item in prompts[:10]:  # Show first 10
         status = prompt_item['status']
-        prompt_text = prompt_item['prompt'][:50] + "..." if len(prompt_item['prompt']) > 50 else prompt_item['prompt']
-        print(f"  [{status.upper()}] {prompt_item['id']}. {prompt_text}")
+        print(f"  [{status.upper()}] {prompt_item['id']}. {truncate_text(prompt_item['prompt'])}")
     
-    if len(job_data['prompts']) > 10:
-        print(f"  ... and {len(job_data['prompts']) - 10} more")
+    if total_prompts > 10:
+        print(f"  ... and {total_prompts - 10} more")
     
     print("=" * 60)
 
-def process_batch_job(job_name, generate_function, model_params):
+async def process_pending_prompts(job_name, pending_items, total, generate_function,
+                                  model, system_prompt, concurrency, cleanup_function=None):
+    """Run pending prompts concurrently, saving each result as it finishes"""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run_prompt(i, prompt_item):
+        async with semaphore:
+            try:
+                response = await generate_function(prompt_item['prompt'], model, system_prompt)
+                return i, prompt_item, response, None
+            except Exception as e:
+                return i, prompt_item, None, e
+    
+    processed_count = 0
+    try:
+        for task in asyncio.as_completed([run_prompt(i, item) for i, item in pending_items]):
+            i, prompt_item, response, error = await task
+            if error is None:
+                update_batch_response(job_name, prompt_item['id'], response)
+                processed_count += 1
+                print(f"[{i}/{total}] ✓ Complete: {truncate_text(prompt_item['prompt'], 60)}")
+            else:
+                mark_batch_failed(job_name, prompt_item['id'])
+                print(f"[{i}/{total}] ✗ Error: {error}")
+    finally:
+        # Clients bound to this event loop must be closed before asyncio.run discards it
+        if cleanup_function is not None:
+            await cleanup_function()
+    
+    return processed_count
+
+def process_batch_job(job_name, generate_function, model_params, concurrency=8, cleanup_function=None):
     """
     Execute/process a batch job
     
     Args:
         job_name: Name of the batch job
-        generate_function: Function to call for text generation (generate_text_streaming)
+        generate_function: Function to call for text generation (generate_text_streaming),
+            or a coroutine function (agenerate_text_streaming) to run prompts concurrently
         model_params: Model parameters object for configuration
+        concurrency: Maximum number of in-flight requests for a coroutine function
+        cleanup_function: Coroutine function awaited when the concurrent run ends,
+            e.g. to close a client bound to its event loop
     """
     job_data = load_batch_job(job_name)
     
@@ -341,35 +661,45 @@ def process_batch_job(job_name, generate_function, model_params):
     if proceed != 'y':
         return False
     
-    # Process each pending prompt
-    processed_count = 0
-    for i, prompt_item in enumerate(job_data['prompts'], 1):
-        if prompt_item['status'] == 'pending':
-            prompt_id = prompt_item['id']
-            prompt_text = prompt_item['prompt']
-            
-            print(f"\n[{i}/{total}] Processing: {prompt_text[:60]}...")
-            
-            try:
-                # Generate response using the provided function
-                response = generate_function(prompt_text, job_data['model'])
-                
-                # Update the job with the response
-                update_batch_response(job_name, prompt_id, response)
-                processed_count += 1
-                
-                print(f"✓ Complete")
-            
-            except Exception as e:
-                print(f"✗ Error: {e}")
-                # Mark as failed
-                job_data = load_batch_job(job_name)
-                for item in job_data['prompts']:
-                    if item['id'] == prompt_id:
-                        item['status'] = 'failed'
-                        job_data['statistics']['failed'] += 1
-                        job_data['statistics']['pending'] -= 1
-                save_batch_job(job_data)
+    # Results are applied to job_data as they are logged, so compaction never re-reads the job file
+    _active_jobs[job_name] = (job_data, {item['id']: item for item in job_data['prompts']})
+    try:
+        if asyncio.iscoroutinefunction(generate_function):
+            pending_items = [
+                (i, item) for i, item in enumerate(job_data['prompts'], 1)
+                if item['status'] == 'pending'
+            ]
+            print(f"\nRunning up to {concurrency} prompt(s) at a time...")
+            processed_count = asyncio.run(process_pending_prompts(
+                job_name, pending_items, total, generate_function,
+                job_data['model'], job_data.get('system_prompt'), concurrency, cleanup_function
+            ))
+        else:
+            # Process each pending prompt
+            processed_count = 0
+            for i, prompt_item in enumerate(job_data['prompts'], 1):
+                if prompt_item['status'] == 'pending':
+                    prompt_id = prompt_item['id']
+                    prompt_text = prompt_item['prompt']
+                    
+                    print(f"\n[{i}/{total}] Processing: {prompt_text[:60]}...")
+                    
+                    try:
+                        # Generate response using the provided function
+                        response = generate_function(prompt_text, job_data['model'])
+                        
+                        # Update the job with the response
+                        update_batch_response(job_name, prompt_id, response)
+                        processed_count += 1
+                        
+                        print(f"✓ Complete")
+                    
+                    except Exception as e:
+                        print(f"✗ Error: {e}")
+                        mark_batch_failed(job_name, prompt_id)
+    finally:
+        compact_batch_job(job_name)
+        _active_jobs.pop(job_name, None)
     
     print(f"\n{'=' * 60}")
     print(f"Batch Processing Complete!")
@@ -419,7 +749,7 @@ def interactive_batch_processor():
                 if result:
                     filename, job_data = result
                     print(f"\n✓ Batch job created from file: {filename}")
-                    print(f"  Total prompts: {len(job_data['prompts'])}")
+                    print(f"  Total prompts: {job_data['statistics']['total']}")
             else:
                 print("File not found.")
         
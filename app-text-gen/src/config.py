@@ -32,6 +32,12 @@ AVAILABLE_MODELS = {
     }
 }
 
+# Model name -> description lookup, built once from AVAILABLE_MODELS
+MODEL_DESCRIPTIONS = {
+    model_info["name"]: model_info["description"]
+    for model_info in AVAILABLE_MODELS.values()
+}
+
 DEFAULT_MODEL = "gpt-4o-mini"
 
 if not GITHUB_TOKEN:
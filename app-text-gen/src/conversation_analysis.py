@@ -1,50 +1,66 @@
 """
 Analysis tools for conversations: word frequency, tone, sentiment, etc.
 """
-import json
 import os
+from bisect import bisect_left
 from collections import Counter
 import re
+from conversation_manager import read_conversation_file
 
 CONVERSATIONS_DIR = "conversations"
 
 def load_conversation(filename):
-    """Load a conversation file"""
+    """Load a conversation file (cached until the file changes, so treat it as read-only)"""
     filepath = os.path.join(CONVERSATIONS_DIR, filename)
     
     if not os.path.exists(filepath):
         return None
     
     try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        return read_conversation_file(filepath)
     except Exception as e:
         print(f"Error loading conversation: {e}")
         return None
 
+# Common English stop words
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
+    'have', 'has', 'had', 'do', 'does', 'did', 'can', 'could', 'should',
+    'would', 'could', 'will', 'shall', 'may', 'might', 'must', 'it', 'its',
+    'as', 'if', 'that', 'this', 'which', 'who', 'what', 'where', 'when',
+    'why', 'how', 'all', 'each', 'every', 'both', 'few', 'more', 'most',
+    'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'same', 'so',
+    'than', 'too', 'very', 'just', 'also', 'even', 'then', 'there'
+})
+WORD_PATTERN = re.compile(r'\b[a-z]+\b')
+
+# Quality ratings as (thresholds, labels): a value above n thresholds gets labels[n]
+DEPTH_LEVELS = ((200, 500), ('shallow', 'moderate', 'deep'))
+ENGAGEMENT_LEVELS = ((5, 10), ('low', 'moderate', 'high'))
+LENGTH_LEVELS = ((10, 20), ('short', 'medium', 'long'))
+BALANCE_LEVELS = ((0.5, 0.8), ('unbalanced', 'moderately-balanced', 'well-balanced'))
+
 def get_word_frequency(text, top_n=20, exclude_common=True):
     """Get word frequency from text"""
-    # Common English stop words
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-        'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
-        'have', 'has', 'had', 'do', 'does', 'did', 'can', 'could', 'should',
-        'would', 'could', 'will', 'shall', 'may', 'might', 'must', 'it', 'its',
-        'as', 'if', 'that', 'this', 'which', 'who', 'what', 'where', 'when',
-        'why', 'how', 'all', 'each', 'every', 'both', 'few', 'more', 'most',
-        'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'same', 'so',
-        'than', 'too', 'very', 'just', 'also', 'even', 'then', 'there'
-    }
-    
     # Convert to lowercase and split into words
-    words = re.findall(r'\b[a-z]+\b', text.lower())
+    words = WORD_PATTERN.findall(text.lower())
     
     # Filter out stop words if requested
     if exclude_common:
-        words = [w for w in words if w not in stop_words and len(w) > 2]
+        word_freq = Counter(w for w in words if len(w) > 2 and w not in STOP_WORDS)
+    else:
+        word_freq = Counter(words)
     
-    # Count word frequencies
-    word_freq = Counter(words)
+    return word_freq.most_common(top_n)
+
+def bulk_word_frequency(texts, top_n=20):
+    """Get combined word frequency over many texts with a single Counter"""
+    word_freq = Counter()
+    for text in texts:
+        if text:
+            word_freq.update(w for w in WORD_PATTERN.findall(text.lower())
+                             if len(w) > 2 and w not in STOP_WORDS)
     return word_freq.most_common(top_n)
 
 def analyze_conversation_structure(conversation_data):
@@ -58,56 +74,56 @@ def analyze_conversation_structure(conversation_data):
         'average_user_message_length': 0,
         'average_assistant_message_length': 0,
         'longest_message': 0,
-        'shortest_message': float('inf'),
+        'shortest_message': 0,
         'conversation_turns': 0
     }
     
-    user_lengths = []
-    assistant_lengths = []
+    user_length_total = 0
+    assistant_length_total = 0
+    longest = 0
+    shortest = None
     
     for msg in messages:
         content_length = len(msg.get('content', ''))
         role = msg.get('role', '')
         
-        analysis['longest_message'] = max(analysis['longest_message'], content_length)
-        analysis['shortest_message'] = min(analysis['shortest_message'], content_length)
+        if content_length > longest:
+            longest = content_length
+        if shortest is None or content_length < shortest:
+            shortest = content_length
         
         if role == 'user':
             analysis['user_messages'] += 1
-            user_lengths.append(content_length)
+            user_length_total += content_length
         elif role == 'assistant':
             analysis['assistant_messages'] += 1
-            assistant_lengths.append(content_length)
+            assistant_length_total += content_length
+    
+    analysis['longest_message'] = longest
+    analysis['shortest_message'] = shortest or 0
     
     # Calculate averages
-    if user_lengths:
-        analysis['average_user_message_length'] = int(sum(user_lengths) / len(user_lengths))
+    if analysis['user_messages']:
+        analysis['average_user_message_length'] = user_length_total // analysis['user_messages']
     
-    if assistant_lengths:
-        analysis['average_assistant_message_length'] = int(sum(assistant_lengths) / len(assistant_lengths))
+    if analysis['assistant_messages']:
+        analysis['average_assistant_message_length'] = assistant_length_total // analysis['assistant_messages']
     
     # Count conversation turns (pairs of user/assistant messages)
     analysis['conversation_turns'] = min(analysis['user_messages'], analysis['assistant_messages'])
     
-    analysis['shortest_message'] = 0 if analysis['shortest_message'] == float('inf') else analysis['shortest_message']
-    
     return analysis
 
 def analyze_conversation_topics(conversation_data):
     """Analyze topics in a conversation"""
     messages = conversation_data.get('messages', [])
     
-    # Combine all messages
-    all_text = ' '.join(msg.get('content', '') for msg in messages)
-    
-    # Get top words
-    word_freq = get_word_frequency(all_text, top_n=20, exclude_common=True)
-    
-    return word_freq
+    # Count words message by message instead of joining all the text first
+    return bulk_word_frequency((msg.get('content', '') for msg in messages), top_n=20)
 
-def calculate_engagement_ratio(conversation_data):
+def calculate_engagement_ratio(conversation_data, structure=None):
     """Calculate engagement ratio (user vs assistant message lengths)"""
-    analysis = analyze_conversation_structure(conversation_data)
+    analysis = structure or analyze_conversation_structure(conversation_data)
     
     if analysis['average_assistant_message_length'] == 0:
         return 0
@@ -115,53 +131,39 @@ def calculate_engagement_ratio(conversation_data):
     ratio = analysis['average_user_message_length'] / analysis['average_assistant_message_length']
     return round(ratio, 2)
 
-def detect_conversation_quality(conversation_data):
+def detect_conversation_quality(conversation_data, structure=None):
     """Detect quality metrics of conversation"""
-    analysis = analyze_conversation_structure(conversation_data)
+    analysis = structure or analyze_conversation_structure(conversation_data)
     
-    quality = {
-        'depth': 'shallow',
-        'engagement': 'low',
-        'length': 'short',
-        'balance': 'unbalanced'
-    }
+    user_messages = analysis['user_messages']
+    assistant_messages = analysis['assistant_messages']
     
     # Determine depth based on message lengths
     avg_length = (analysis['average_user_message_length'] + analysis['average_assistant_message_length']) / 2
-    if avg_length > 500:
-        quality['depth'] = 'deep'
-    elif avg_length > 200:
-        quality['depth'] = 'moderate'
-    else:
-        quality['depth'] = 'shallow'
-    
-    # Determine engagement based on number of turns
-    if analysis['conversation_turns'] > 10:
-        quality['engagement'] = 'high'
-    elif analysis['conversation_turns'] > 5:
-        quality['engagement'] = 'moderate'
-    else:
-        quality['engagement'] = 'low'
-    
-    # Determine length
-    if analysis['total_messages'] > 20:
-        quality['length'] = 'long'
-    elif analysis['total_messages'] > 10:
-        quality['length'] = 'medium'
-    else:
-        quality['length'] = 'short'
     
     # Determine balance
-    if analysis['user_messages'] > 0 and analysis['assistant_messages'] > 0:
-        ratio = min(analysis['user_messages'], analysis['assistant_messages']) / max(analysis['user_messages'], analysis['assistant_messages'])
-        if ratio > 0.8:
-            quality['balance'] = 'well-balanced'
-        elif ratio > 0.5:
-            quality['balance'] = 'moderately-balanced'
-        else:
-            quality['balance'] = 'unbalanced'
+    ratio = 0
+    if user_messages > 0 and assistant_messages > 0:
+        ratio = min(user_messages, assistant_messages) / max(user_messages, assistant_messages)
+    
+    # Each value is rated by how many thresholds it exceeds
+    return {
+        'depth': DEPTH_LEVELS[1][bisect_left(DEPTH_LEVELS[0], avg_length)],
+        'engagement': ENGAGEMENT_LEVELS[1][bisect_left(ENGAGEMENT_LEVELS[0], analysis['conversation_turns'])],
+        'length': LENGTH_LEVELS[1][bisect_left(LENGTH_LEVELS[0], analysis['total_messages'])],
+        'balance': BALANCE_LEVELS[1][bisect_left(BALANCE_LEVELS[0], ratio)]
+    }
+
+def analyze_conversation(conversation_data, include_topics=True):
+    """Compute structure, quality, engagement ratio and topics, walking the messages only once for structure"""
+    structure = analyze_conversation_structure(conversation_data)
     
-    return quality
+    return {
+        'structure': structure,
+        'quality': detect_conversation_quality(conversation_data, structure),
+        'engagement_ratio': calculate_engagement_ratio(conversation_data, structure),
+        'topics': analyze_conversation_topics(conversation_data) if include_topics else []
+    }
 
 def display_conversation_analysis(filename):
     """Display comprehensive analysis of a conversation"""
@@ -175,8 +177,10 @@ def display_conversation_analysis(filename):
     print(f"Conversation Analysis: {filename}")
     print("=" * 60)
     
+    analysis = analyze_conversation(conversation_data)
+    
     # Structure analysis
-    structure = analyze_conversation_structure(conversation_data)
+    structure = analysis['structure']
     print("\n--- Structure ---")
     print(f"Total Messages:                {structure['total_messages']}")
     print(f"User Messages:                 {structure['user_messages']}")
@@ -188,7 +192,7 @@ def display_conversation_analysis(filename):
     print(f"Shortest Message:              {structure['shortest_message']} characters")
     
     # Quality metrics
-    quality = detect_conversation_quality(conversation_data)
+    quality = analysis['quality']
     print("\n--- Quality Metrics ---")
     print(f"Depth:                         {quality['depth']}")
     print(f"Engagement:                    {quality['engagement']}")
@@ -196,7 +200,7 @@ def display_conversation_analysis(filename):
     print(f"Balance:                       {quality['balance']}")
     
     # Engagement ratio
-    engagement_ratio = calculate_engagement_ratio(conversation_data)
+    engagement_ratio = analysis['engagement_ratio']
     print(f"\nEngagement Ratio:              {engagement_ratio} (User:Assistant)")
     if engagement_ratio > 1:
         print(f"  Users are asking longer questions than responses")
@@ -204,7 +208,7 @@ def display_conversation_analysis(filename):
         print(f"  Assistant is providing longer responses than user queries")
     
     # Top words
-    topics = analyze_conversation_topics(conversation_data)
+    topics = analysis['topics']
     print("\n--- Top Words (Content Frequency) ---")
     for i, (word, count) in enumerate(topics[:10], 1):
         print(f"{i:2d}. {word:20s} ({count} times)")
@@ -224,12 +228,40 @@ def display_conversation_summary(filename):
         print("Could not load conversation.")
         return
     
-    structure = analyze_conversation_structure(conversation_data)
-    quality = detect_conversation_quality(conversation_data)
+    analysis = analyze_conversation(conversation_data, include_topics=False)
+    structure = analysis['structure']
+    quality = analysis['quality']
     
     print(f"\n{filename}")
     print(f"  Messages: {structure['total_messages']} | Turns: {structure['conversation_turns']} | Depth: {quality['depth']} | Engagement: {quality['engagement']}")
 
+def analyze_all_conversations(filenames):
+    """Message counts and top words across many saved conversations"""
+    conversations = [data for data in (load_conversation(f) for f in filenames) if data]
+    messages = [msg for data in conversations for msg in data.get('messages', [])]
+    
+    return {
+        'conversations': len(conversations),
+        'total_messages': len(messages),
+        'topics': bulk_word_frequency(msg.get('content', '') for msg in messages)
+    }
+
+def display_all_conversations_analysis(filenames):
+    """Display top words across all saved conversations"""
+    analysis = analyze_all_conversations(filenames)
+    
+    print("\n" + "=" * 60)
+    print("All Conversations")
+    print("=" * 60)
+    print(f"Conversations:  {analysis['conversations']}")
+    print(f"Total Messages: {analysis['total_messages']}")
+    
+    print("\n--- Top Words (Content Frequency) ---")
+    for i, (word, count) in enumerate(analysis['topics'], 1):
+        print(f"{i:2d}. {word:20s} ({count} times)")
+    
+    print("=" * 60)
+
 def interactive_analysis():
     """Interactive conversation analysis"""
     from conversation_manager import display_saved_conversations
@@ -244,11 +276,15 @@ def interactive_analysis():
         return
     
     try:
-        choice = input("\nEnter conversation number to analyze (or press Enter to cancel): ").strip()
+        choice = input("\nEnter conversation number to analyze, 'all' for every conversation (or press Enter to cancel): ").strip()
         
         if not choice:
             return
         
+        if choice.lower() == 'all':
+            display_all_conversations_analysis(files)
+            return
+        
         choice_num = int(choice) - 1
         if 0 <= choice_num < len(files):
             filename = files[choice_num]
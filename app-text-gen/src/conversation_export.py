@@ -1,29 +1,65 @@
 """
 Export conversations to different formats (CSV, Markdown, etc.)
 """
-import json
 import os
 import csv
 from datetime import datetime
+from conversation_manager import read_conversation_file
 
 CONVERSATIONS_DIR = "conversations"
 EXPORTS_DIR = "exports"
+# 128 KiB write buffer, so a typical export reaches the disk in a single write
+EXPORT_BUFFER_SIZE = 1 << 17
+
+# Static start of every HTML export, up to the page heading
+HTML_HEADER = (
+    "<!DOCTYPE html>\n"
+    "<html>\n"
+    "<head>\n"
+    "  <meta charset='UTF-8'>\n"
+    "  <title>Conversation Export</title>\n"
+    "  <style>\n"
+    "    body { font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }\n"
+    "    .container { max-width: 900px; margin: 0 auto; background-color: white; padding: 20px; border-radius: 5px; }\n"
+    "    .metadata { background-color: #f0f0f0; padding: 10px; border-radius: 3px; margin-bottom: 20px; }\n"
+    "    .system-prompt { background-color: #fff3cd; padding: 10px; border-left: 4px solid #ffc107; margin-bottom: 20px; }\n"
+    "    .message { margin-bottom: 15px; padding: 10px; border-radius: 3px; }\n"
+    "    .user { background-color: #e3f2fd; border-left: 4px solid #2196F3; }\n"
+    "    .assistant { background-color: #f3e5f5; border-left: 4px solid #9c27b0; }\n"
+    "    .role { font-weight: bold; color: #333; }\n"
+    "    .content { margin-top: 5px; white-space: pre-wrap; word-wrap: break-word; }\n"
+    "    .footer { text-align: center; margin-top: 30px; color: #999; font-size: 12px; }\n"
+    "  </style>\n"
+    "</head>\n"
+    "<body>\n"
+    "  <div class='container'>\n"
+    "    <h1>Conversation Export</h1>\n"
+)
+# Characters that would otherwise be read as markup in element text
+HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+_exports_dir_ready = False
 
 def ensure_exports_dir():
-    """Create exports directory if it doesn't exist"""
-    if not os.path.exists(EXPORTS_DIR):
-        os.makedirs(EXPORTS_DIR)
+    """Create exports directory if it doesn't exist (checked once per process)"""
+    global _exports_dir_ready
+    if not _exports_dir_ready:
+        os.makedirs(EXPORTS_DIR, exist_ok=True)
+        _exports_dir_ready = True
+
+def escape_html(value):
+    """Escape a value for use as HTML element text"""
+    return str(value).translate(HTML_ESCAPE_TABLE)
 
 def load_conversation_data(filename):
-    """Load conversation from file"""
+    """Load conversation from file (cached until the file changes, so treat it as read-only)"""
     filepath = os.path.join(CONVERSATIONS_DIR, filename)
     
     if not os.path.exists(filepath):
         return None
     
     try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        return read_conversation_file(filepath)
     except Exception as e:
         print(f"Error loading conversation: {e}")
         return None
@@ -31,9 +67,10 @@ def load_conversation_data(filename):
 def export_to_markdown(conversation_data, filename=None):
     """Export conversation to Markdown format"""
     ensure_exports_dir()
+    now = datetime.now()
     
     if not filename:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         filename = f"conversation_{timestamp}.md"
     else:
         # Replace .json with .md if needed
@@ -42,36 +79,38 @@ def export_to_markdown(conversation_data, filename=None):
     filepath = os.path.join(EXPORTS_DIR, filename)
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            # Write header
-            f.write("# Conversation Export\n\n")
-            f.write(f"**Exported:** {datetime.now().isoformat()}\n\n")
-            
-            # Write metadata
-            f.write("## Metadata\n\n")
-            f.write(f"- **Model:** {conversation_data.get('model', 'Unknown')}\n")
-            f.write(f"- **Timestamp:** {conversation_data.get('timestamp', 'Unknown')}\n")
-            f.write(f"- **Messages:** {len(conversation_data.get('messages', []))}\n\n")
-            
-            # Write system prompt
-            system_prompt = conversation_data.get('system_prompt', '')
-            if system_prompt:
-                f.write("## System Prompt\n\n")
-                f.write(f"> {system_prompt}\n\n")
-            
-            # Write conversation
-            f.write("## Conversation\n\n")
-            messages = conversation_data.get('messages', [])
-            
-            for i, msg in enumerate(messages, 1):
-                role = msg.get('role', 'unknown').upper()
-                content = msg.get('content', '')
-                
-                f.write(f"### {i}. {role}\n\n")
-                f.write(f"{content}\n\n")
+        exported_at = now.isoformat()
+        
+        # Write header
+        parts = ["# Conversation Export\n\n", f"**Exported:** {exported_at}\n\n"]
+        
+        # Write metadata
+        parts.append("## Metadata\n\n")
+        parts.append(f"- **Model:** {conversation_data.get('model', 'Unknown')}\n")
+        parts.append(f"- **Timestamp:** {conversation_data.get('timestamp', 'Unknown')}\n")
+        parts.append(f"- **Messages:** {len(conversation_data.get('messages', []))}\n\n")
+        
+        # Write system prompt
+        system_prompt = conversation_data.get('system_prompt', '')
+        if system_prompt:
+            parts.append("## System Prompt\n\n")
+            parts.append(f"> {system_prompt}\n\n")
+        
+        # Write conversation
+        parts.append("## Conversation\n\n")
+        messages = conversation_data.get('messages', [])
+        
+        for i, msg in enumerate(messages, 1):
+            role = msg.get('role', 'unknown').upper()
+            content = msg.get('content', '')
             
-            f.write("---\n")
-            f.write(f"*Exported on {datetime.now().isoformat()}*\n")
+            parts.append(f"### {i}. {role}\n\n{content}\n\n")
+        
+        parts.append("---\n")
+        parts.append(f"*Exported on {exported_at}*\n")
+        
+        with open(filepath, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            f.write("".join(parts))
         
         return filepath
     
@@ -82,9 +121,10 @@ def export_to_markdown(conversation_data, filename=None):
 def export_to_csv(conversation_data, filename=None):
     """Export conversation to CSV format"""
     ensure_exports_dir()
+    now = datetime.now()
     
     if not filename:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         filename = f"conversation_{timestamp}.csv"
     else:
         # Replace .json with .csv if needed
@@ -95,7 +135,7 @@ def export_to_csv(conversation_data, filename=None):
     try:
         messages = conversation_data.get('messages', [])
         
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        with open(filepath, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
             writer = csv.writer(f)
             
             # Write header
@@ -105,11 +145,10 @@ def export_to_csv(conversation_data, filename=None):
             timestamp = conversation_data.get('timestamp', '')
             
             # Write messages
-            for i, msg in enumerate(messages, 1):
-                role = msg.get('role', 'unknown')
-                content = msg.get('content', '')
-                
-                writer.writerow([i, role, content, model, timestamp])
+            writer.writerows(
+                (i, msg.get('role', 'unknown'), msg.get('content', ''), model, timestamp)
+                for i, msg in enumerate(messages, 1)
+            )
         
         return filepath
     
@@ -120,9 +159,10 @@ def export_to_csv(conversation_data, filename=None):
 def export_to_plain_text(conversation_data, filename=None):
     """Export conversation to plain text format"""
     ensure_exports_dir()
+    now = datetime.now()
     
     if not filename:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         filename = f"conversation_{timestamp}.txt"
     else:
         # Replace .json with .txt if needed
@@ -131,39 +171,38 @@ def export_to_plain_text(conversation_data, filename=None):
     filepath = os.path.join(EXPORTS_DIR, filename)
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            # Write header
-            f.write("=" * 60 + "\n")
-            f.write("CONVERSATION EXPORT\n")
-            f.write("=" * 60 + "\n\n")
-            
-            # Write metadata
-            f.write(f"Model: {conversation_data.get('model', 'Unknown')}\n")
-            f.write(f"Timestamp: {conversation_data.get('timestamp', 'Unknown')}\n")
-            f.write(f"Total Messages: {len(conversation_data.get('messages', []))}\n\n")
-            
-            # Write system prompt
-            system_prompt = conversation_data.get('system_prompt', '')
-            if system_prompt:
-                f.write("System Prompt:\n")
-                f.write("-" * 60 + "\n")
-                f.write(f"{system_prompt}\n")
-                f.write("-" * 60 + "\n\n")
-            
-            # Write conversation
-            f.write("Conversation:\n")
-            f.write("=" * 60 + "\n\n")
-            messages = conversation_data.get('messages', [])
-            
-            for i, msg in enumerate(messages, 1):
-                role = msg.get('role', 'unknown').upper()
-                content = msg.get('content', '')
-                
-                f.write(f"{role}:\n")
-                f.write(f"{content}\n\n")
+        # Write header
+        parts = ["=" * 60 + "\n", "CONVERSATION EXPORT\n", "=" * 60 + "\n\n"]
+        
+        # Write metadata
+        parts.append(f"Model: {conversation_data.get('model', 'Unknown')}\n")
+        parts.append(f"Timestamp: {conversation_data.get('timestamp', 'Unknown')}\n")
+        parts.append(f"Total Messages: {len(conversation_data.get('messages', []))}\n\n")
+        
+        # Write system prompt
+        system_prompt = conversation_data.get('system_prompt', '')
+        if system_prompt:
+            parts.append("System Prompt:\n")
+            parts.append("-" * 60 + "\n")
+            parts.append(f"{system_prompt}\n")
+            parts.append("-" * 60 + "\n\n")
+        
+        # Write conversation
+        parts.append("Conversation:\n")
+        parts.append("=" * 60 + "\n\n")
+        messages = conversation_data.get('messages', [])
+        
+        for msg in messages:
+            role = msg.get('role', 'unknown').upper()
+            content = msg.get('content', '')
             
-            f.write("=" * 60 + "\n")
-            f.write(f"Exported: {datetime.now().isoformat()}\n")
+            parts.append(f"{role}:\n{content}\n\n")
+        
+        parts.append("=" * 60 + "\n")
+        parts.append(f"Exported: {now.isoformat()}\n")
+        
+        with open(filepath, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            f.write("".join(parts))
         
         return filepath
     
@@ -174,9 +213,10 @@ def export_to_plain_text(conversation_data, filename=None):
 def export_to_html(conversation_data, filename=None):
     """Export conversation to HTML format"""
     ensure_exports_dir()
+    now = datetime.now()
     
     if not filename:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         filename = f"conversation_{timestamp}.html"
     else:
         # Replace .json with .html if needed
@@ -185,69 +225,48 @@ def export_to_html(conversation_data, filename=None):
     filepath = os.path.join(EXPORTS_DIR, filename)
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            # Write HTML header
-            f.write("<!DOCTYPE html>\n")
-            f.write("<html>\n")
-            f.write("<head>\n")
-            f.write("  <meta charset='UTF-8'>\n")
-            f.write("  <title>Conversation Export</title>\n")
-            f.write("  <style>\n")
-            f.write("    body { font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }\n")
-            f.write("    .container { max-width: 900px; margin: 0 auto; background-color: white; padding: 20px; border-radius: 5px; }\n")
-            f.write("    .metadata { background-color: #f0f0f0; padding: 10px; border-radius: 3px; margin-bottom: 20px; }\n")
-            f.write("    .system-prompt { background-color: #fff3cd; padding: 10px; border-left: 4px solid #ffc107; margin-bottom: 20px; }\n")
-            f.write("    .message { margin-bottom: 15px; padding: 10px; border-radius: 3px; }\n")
-            f.write("    .user { background-color: #e3f2fd; border-left: 4px solid #2196F3; }\n")
-            f.write("    .assistant { background-color: #f3e5f5; border-left: 4px solid #9c27b0; }\n")
-            f.write("    .role { font-weight: bold; color: #333; }\n")
-            f.write("    .content { margin-top: 5px; white-space: pre-wrap; word-wrap: break-word; }\n")
-            f.write("    .footer { text-align: center; margin-top: 30px; color: #999; font-size: 12px; }\n")
-            f.write("  </style>\n")
-            f.write("</head>\n")
-            f.write("<body>\n")
-            f.write("  <div class='container'>\n")
-            
-            # Write header
-            f.write("    <h1>Conversation Export</h1>\n")
-            
-            # Write metadata
-            f.write("    <div class='metadata'>\n")
-            f.write(f"      <p><strong>Model:</strong> {conversation_data.get('model', 'Unknown')}</p>\n")
-            f.write(f"      <p><strong>Timestamp:</strong> {conversation_data.get('timestamp', 'Unknown')}</p>\n")
-            f.write(f"      <p><strong>Messages:</strong> {len(conversation_data.get('messages', []))}</p>\n")
-            f.write("    </div>\n")
-            
-            # Write system prompt
-            system_prompt = conversation_data.get('system_prompt', '')
-            if system_prompt:
-                f.write("    <div class='system-prompt'>\n")
-                f.write("      <strong>System Prompt:</strong>\n")
-                f.write(f"      <p>{system_prompt}</p>\n")
-                f.write("    </div>\n")
-            
-            # Write conversation
-            f.write("    <h2>Conversation</h2>\n")
-            messages = conversation_data.get('messages', [])
-            
-            for i, msg in enumerate(messages, 1):
-                role = msg.get('role', 'unknown')
-                content = msg.get('content', '')
-                
-                css_class = 'user' if role == 'user' else 'assistant'
-                f.write(f"    <div class='message {css_class}'>\n")
-                f.write(f"      <span class='role'>{role.upper()}</span>\n")
-                f.write(f"      <div class='content'>{content}</div>\n")
-                f.write("    </div>\n")
-            
-            # Write footer
-            f.write("    <div class='footer'>\n")
-            f.write(f"      <p>Exported on {datetime.now().isoformat()}</p>\n")
-            f.write("    </div>\n")
+        # Build the whole document first and write it once
+        parts = [HTML_HEADER]
+        
+        # Write metadata
+        parts.append("    <div class='metadata'>\n")
+        parts.append(f"      <p><strong>Model:</strong> {escape_html(conversation_data.get('model', 'Unknown'))}</p>\n")
+        parts.append(f"      <p><strong>Timestamp:</strong> {escape_html(conversation_data.get('timestamp', 'Unknown'))}</p>\n")
+        parts.append(f"      <p><strong>Messages:</strong> {len(conversation_data.get('messages', []))}</p>\n")
+        parts.append("    </div>\n")
+        
+        # Write system prompt
+        system_prompt = conversation_data.get('system_prompt', '')
+        if system_prompt:
+            parts.append("    <div class='system-prompt'>\n")
+            parts.append("      <strong>System Prompt:</strong>\n")
+            parts.append(f"      <p>{escape_html(system_prompt)}</p>\n")
+            parts.append("    </div>\n")
+        
+        # Write conversation
+        parts.append("    <h2>Conversation</h2>\n")
+        messages = conversation_data.get('messages', [])
+        
+        for msg in messages:
+            role = msg.get('role', 'unknown')
+            content = msg.get('content', '')
             
-            f.write("  </div>\n")
-            f.write("</body>\n")
-            f.write("</html>\n")
+            css_class = 'user' if role == 'user' else 'assistant'
+            parts.append(
+                f"    <div class='message {css_class}'>\n"
+                f"      <span class='role'>{escape_html(role.upper())}</span>\n"
+                f"      <div class='content'>{escape_html(content)}</div>\n"
+                "    </div>\n"
+            )
+        
+        # Write footer
+        parts.append("    <div class='footer'>\n")
+        parts.append(f"      <p>Exported on {now.isoformat()}</p>\n")
+        parts.append("    </div>\n")
+        parts.append("  </div>\n</body>\n</html>\n")
+        
+        with open(filepath, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            f.write("".join(parts))
         
         return filepath
     
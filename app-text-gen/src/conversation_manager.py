@@ -4,13 +4,23 @@ Conversation file management utilities
 import json
 import os
 from datetime import datetime
+from functools import lru_cache
+import json_utils
 
 CONVERSATIONS_DIR = "conversations"
+# Model, timestamp and message count per saved conversation, keyed by filename and
+# validated against the file's mtime and size, so listings skip parsing unchanged files
+SUMMARY_CACHE_FILE = os.path.join(CONVERSATIONS_DIR, ".summary_cache")
+
+_summary_cache = None
+_conversations_dir_ready = False
 
 def ensure_conversations_dir():
-    """Create conversations directory if it doesn't exist"""
-    if not os.path.exists(CONVERSATIONS_DIR):
-        os.makedirs(CONVERSATIONS_DIR)
+    """Create conversations directory if it doesn't exist (checked once per process)"""
+    global _conversations_dir_ready
+    if not _conversations_dir_ready:
+        os.makedirs(CONVERSATIONS_DIR, exist_ok=True)
+        _conversations_dir_ready = True
 
 def get_conversation_filename(name=None):
     """Generate a conversation filename"""
@@ -22,7 +32,7 @@ def get_conversation_filename(name=None):
     return os.path.join(CONVERSATIONS_DIR, f"conversation_{timestamp}.json")
 
 def save_conversation(conversation_history, system_prompt, model_name, filename=None):
-    """Save conversation to a JSON file"""
+    """Save conversation to a JSON file, using orjson when available"""
     ensure_conversations_dir()
     
     if not filename:
@@ -35,18 +45,31 @@ def save_conversation(conversation_history, system_prompt, model_name, filename=
         "messages": conversation_history
     }
     
-    with open(filename, 'w') as f:
-        json.dump(conversation_data, f, indent=2)
+    # Encoded in one go (with orjson when installed) and written in a single call
+    with open(filename, 'wb') as f:
+        f.write(json_utils.dumps(conversation_data, indent=True))
+    
+    if os.path.dirname(os.path.abspath(filename)) == os.path.abspath(CONVERSATIONS_DIR):
+        record_conversation_summary(os.path.basename(filename), conversation_data)
     
     return filename
 
+@lru_cache(maxsize=128)
+def _read_conversation_file(filepath, mtime_ns, size):
+    """Parse a conversation file; the stat values in the key make any rewrite a cache miss"""
+    return json_utils.load_file(filepath)
+
+def read_conversation_file(filepath):
+    """Parse a conversation file, cached until it changes (so treat the result as read-only)"""
+    stat = os.stat(filepath)
+    return _read_conversation_file(filepath, stat.st_mtime_ns, stat.st_size)
+
 def load_conversation(filename):
     """Load conversation from a JSON file"""
     if not os.path.exists(filename):
         return None, None, None
     
-    with open(filename, 'r') as f:
-        data = json.load(f)
+    data = json_utils.load_file(filename)
     
     return (data.get("messages", []), 
             data.get("system_prompt", "You are a helpful assistant."),
@@ -58,10 +81,96 @@ def list_saved_conversations():
     
     files = []
     if os.path.exists(CONVERSATIONS_DIR):
-        files = [f for f in os.listdir(CONVERSATIONS_DIR) if f.endswith('.json')]
+        with os.scandir(CONVERSATIONS_DIR) as entries:
+            files = [entry.name for entry in entries if entry.name.endswith('.json') and entry.is_file()]
     
     return sorted(files, reverse=True)  # Most recent first
 
+def load_summary_cache():
+    """Return the in-process summary cache, reading it from disk on first use"""
+    global _summary_cache
+    if _summary_cache is None:
+        _summary_cache = {}
+        if os.path.exists(SUMMARY_CACHE_FILE):
+            try:
+                with open(SUMMARY_CACHE_FILE, 'rb') as f:
+                    _summary_cache = json.loads(f.read())
+            except (OSError, ValueError):
+                pass  # Rebuilt from the conversation files
+    return _summary_cache
+
+def summarize_conversation(data, stat):
+    """The cached fields for a conversation file's data and os.stat result"""
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "model": data.get("model", "Unknown"),
+        "timestamp": data.get("timestamp", "Unknown"),
+        "message_count": len(data.get("messages", []))
+    }
+
+def record_conversation_summary(filename, conversation_data):
+    """Store the summary of a conversation that was just written, without re-reading it"""
+    cache = load_summary_cache()
+    cache[filename] = summarize_conversation(conversation_data, os.stat(os.path.join(CONVERSATIONS_DIR, filename)))
+    save_summary_cache()
+
+def get_conversation_summary(filename):
+    """
+    Model, timestamp and message count of a saved conversation
+    
+    Returns the summary and whether it had to be read from the file.
+    """
+    cache = load_summary_cache()
+    stat = os.stat(os.path.join(CONVERSATIONS_DIR, filename))
+    
+    summary = cache.get(filename)
+    if summary and summary["mtime_ns"] == stat.st_mtime_ns and summary["size"] == stat.st_size:
+        return summary, False
+    
+    with open(os.path.join(CONVERSATIONS_DIR, filename), 'rb') as f:
+        raw = f.read()
+    data = json_utils.loads(raw)
+    
+    summary = summarize_conversation(data, stat)
+    cache[filename] = summary
+    return summary, True
+
+def get_conversation_summaries(files=None):
+    """
+    Summaries of saved conversations by filename, parsing only new or changed files
+    
+    Files that cannot be read map to {"error": message}.
+    """
+    if files is None:
+        files = list_saved_conversations()
+    
+    cache_changed = len(load_summary_cache()) != len(files)
+    summaries = {}
+    for filename in files:
+        try:
+            summaries[filename], was_read = get_conversation_summary(filename)
+            cache_changed = cache_changed or was_read
+        except Exception as e:
+            summaries[filename] = {"error": str(e)}
+    
+    if cache_changed:
+        save_summary_cache(files)
+    return summaries
+
+def save_summary_cache(filenames=None):
+    """Write the summary cache to disk, dropping entries not in filenames when it is given"""
+    cache = load_summary_cache()
+    if filenames is not None:
+        for filename in set(cache) - set(filenames):
+            del cache[filename]
+    
+    try:
+        with open(SUMMARY_CACHE_FILE, 'w') as f:
+            json.dump(cache, f, separators=(',', ':'))
+    except OSError:
+        pass  # The cache is only an optimization
+
 def display_saved_conversations():
     """Display saved conversations in a nice format"""
     files = list_saved_conversations()
@@ -74,19 +183,15 @@ def display_saved_conversations():
     print("Saved Conversations:")
     print("=" * 60)
     
+    summaries = get_conversation_summaries(files)
     for i, filename in enumerate(files, 1):
-        filepath = os.path.join(CONVERSATIONS_DIR, filename)
-        try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-                model = data.get("model", "Unknown")
-                timestamp = data.get("timestamp", "Unknown")
-                msg_count = len(data.get("messages", []))
-                
-            print(f"{i}. {filename}")
-            print(f"   Model: {model} | Messages: {msg_count} | Time: {timestamp}")
-        except Exception as e:
-            print(f"{i}. {filename} (Error reading: {e})")
+        summary = summaries[filename]
+        if "error" in summary:
+            print(f"{i}. {filename} (Error reading: {summary['error']})")
+            continue
+        
+        print(f"{i}. {filename}")
+        print(f"   Model: {summary['model']} | Messages: {summary['message_count']} | Time: {summary['timestamp']}")
     
     print("=" * 60)
     return files
@@ -96,6 +201,8 @@ def delete_conversation(filename):
     filepath = os.path.join(CONVERSATIONS_DIR, filename)
     if os.path.exists(filepath):
         os.remove(filepath)
+        if load_summary_cache().pop(filename, None):
+            save_summary_cache()
         print(f"Deleted: {filename}")
         return True
     return False
@@ -1,11 +1,84 @@
 """
 Search functionality for saved conversations
 """
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import repeat
+from conversation_manager import read_conversation_file
+from search_index import find_candidate_files, load_search_index
+import json_utils
 
 CONVERSATIONS_DIR = "conversations"
+# File reads dominate a search, so use more threads than cores
+SEARCH_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def get_query_bytes(query_lower):
+    """
+    The query as bytes for a raw-file prefilter, or None if it cannot be used
+    
+    Only printable ASCII without quotes, backslashes or slashes is written to a
+    JSON file unchanged, so only such a query can be looked for in the raw bytes.
+    """
+    if query_lower.isascii() and query_lower.isprintable() and not any(c in query_lower for c in '"\\/'):
+        return query_lower.encode('ascii')
+    return None
+
+def scan_conversation(filename, query_lower, search_type, query_bytes=None):
+    """Search one conversation file; returns (filename, data, matches) or None"""
+    try:
+        filepath = os.path.join(CONVERSATIONS_DIR, filename)
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        
+        # An all-ASCII file without \u escapes reads the same raw as parsed, so a
+        # query missing from its lowercased bytes cannot match and is not parsed
+        if query_bytes and raw.isascii() and b'\\u' not in raw and query_bytes not in raw.lower():
+            return None
+        
+        data = json_utils.loads(raw)
+        
+        matches = []
+        
+        # Search in messages (content)
+        if search_type in ['content', 'all']:
+            messages = data.get('messages', [])
+            for i, msg in enumerate(messages):
+                content = msg.get('content') or ''
+                if query_lower in content.lower():
+                    matches.append({
+                        'type': 'message',
+                        'index': i,
+                        'role': msg.get('role'),
+                        'snippet': content[:100] + "..." if len(content) > 100 else content
+                    })
+        
+        # Search in prompts
+        if search_type in ['prompt', 'all']:
+            system_prompt = data.get('system_prompt', '').lower()
+            if query_lower in system_prompt:
+                matches.append({
+                    'type': 'system_prompt',
+                    'content': data.get('system_prompt')
+                })
+        
+        # Search in model name
+        if search_type in ['model', 'all']:
+            model = data.get('model', '').lower()
+            if query_lower in model:
+                matches.append({
+                    'type': 'model',
+                    'model': data.get('model')
+                })
+        
+        # Add result if there are matches
+        if matches:
+            return (filename, data, matches)
+    
+    except Exception as e:
+        print(f"Error searching in {filename}: {e}")
+    
+    return None
 
 def search_conversations(query, search_type="content"):
     """
@@ -25,54 +98,21 @@ def search_conversations(query, search_type="content"):
     
     query_lower = query.lower()
     
-    for filename in os.listdir(CONVERSATIONS_DIR):
-        if not filename.endswith('.json'):
-            continue
-        
-        try:
-            filepath = os.path.join(CONVERSATIONS_DIR, filename)
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            
-            matches = []
-            
-            # Search in messages (content)
-            if search_type in ['content', 'all']:
-                messages = data.get('messages', [])
-                for i, msg in enumerate(messages):
-                    content = msg.get('content', '').lower()
-                    if query_lower in content:
-                        matches.append({
-                            'type': 'message',
-                            'index': i,
-                            'role': msg.get('role'),
-                            'snippet': msg.get('content')[:100] + "..." if len(msg.get('content', '')) > 100 else msg.get('content')
-                        })
-            
-            # Search in prompts
-            if search_type in ['prompt', 'all']:
-                system_prompt = data.get('system_prompt', '').lower()
-                if query_lower in system_prompt:
-                    matches.append({
-                        'type': 'system_prompt',
-                        'content': data.get('system_prompt')
-                    })
-            
-            # Search in model name
-            if search_type in ['model', 'all']:
-                model = data.get('model', '').lower()
-                if query_lower in model:
-                    matches.append({
-                        'type': 'model',
-                        'model': data.get('model')
-                    })
-            
-            # Add result if there are matches
-            if matches:
-                results.append((filename, data, matches))
-        
-        except Exception as e:
-            print(f"Error searching in {filename}: {e}")
+    # Only conversations holding every trigram of the query are opened
+    with os.scandir(CONVERSATIONS_DIR) as entries:
+        filenames = [entry.name for entry in entries if entry.name.endswith('.json') and entry.is_file()]
+    candidates = find_candidate_files(query_lower, filenames)
+    
+    # Files the index could not read are always parsed, so their errors get reported
+    query_bytes = get_query_bytes(query_lower)
+    indexed = load_search_index()["files"]
+    prefilters = [query_bytes if filename in indexed else None for filename in candidates]
+    
+    # Reads overlap across threads; map keeps the directory order
+    with ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS) as executor:
+        for result in executor.map(scan_conversation, candidates, repeat(query_lower), repeat(search_type), prefilters):
+            if result:
+                results.append(result)
     
     return results
 
@@ -143,8 +183,18 @@ def interactive_search():
     results = search_conversations(query, search_type)
     return display_search_results(results)
 
+def load_search_result(filename):
+    """Load a conversation as a match-less search result, or None if it cannot be read"""
+    try:
+        return (filename, read_conversation_file(os.path.join(CONVERSATIONS_DIR, filename)), [])
+    except Exception as e:
+        print(f"Error reading {filename}: {e}")
+        return None
+
 def search_by_date_range(start_date, end_date):
     """Search conversations within a date range"""
+    from conversation_manager import get_conversation_summaries
+    
     results = []
     
     if not os.path.exists(CONVERSATIONS_DIR):
@@ -157,24 +207,26 @@ def search_by_date_range(start_date, end_date):
         print("Invalid date format. Use ISO format (YYYY-MM-DD).")
         return results
     
-    for filename in os.listdir(CONVERSATIONS_DIR):
-        if not filename.endswith('.json'):
+    # Filter on the cached timestamps and only open the conversations that match
+    matching = []
+    for filename, summary in get_conversation_summaries().items():
+        if "error" in summary:
+            print(f"Error reading {filename}: {summary['error']}")
             continue
         
         try:
-            filepath = os.path.join(CONVERSATIONS_DIR, filename)
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            
-            timestamp_str = data.get('timestamp', '')
-            if timestamp_str:
+            timestamp_str = summary['timestamp']
+            if timestamp_str and timestamp_str != 'Unknown':
                 timestamp = datetime.fromisoformat(timestamp_str)
                 if start <= timestamp <= end:
-                    results.append((filename, data, []))
+                    matching.append(filename)
         
         except Exception as e:
             print(f"Error reading {filename}: {e}")
     
+    with ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS) as executor:
+        results = [result for result in executor.map(load_search_result, matching) if result]
+    
     return results
 
 def get_conversation_stats(filename):
@@ -185,26 +237,28 @@ def get_conversation_stats(filename):
         return None
     
     try:
-        with open(filepath, 'r') as f:
-            data = json.load(f)
+        data = read_conversation_file(filepath)
         
         messages = data.get('messages', [])
         
-        # Count messages by role
-        user_messages = sum(1 for msg in messages if msg.get('role') == 'user')
-        assistant_messages = sum(1 for msg in messages if msg.get('role') == 'assistant')
+        # Count roles, words and the longest message in a single pass
+        user_messages = assistant_messages = total_words = 0
+        longest_length = 0
+        longest_role = None
+        for i, msg in enumerate(messages):
+            content = msg.get('content', '')
+            role = msg.get('role')
+            if role == 'user':
+                user_messages += 1
+            elif role == 'assistant':
+                assistant_messages += 1
+            total_words += len(content.split())
+            if i == 0 or len(content) > longest_length:
+                longest_length = len(content)
+                longest_role = role
         
-        # Calculate total tokens (rough estimate)
-        total_words = sum(len(msg.get('content', '').split()) for msg in messages)
         estimated_tokens = int(total_words * 1.3)  # Rough estimate
         
-        # Find longest message
-        longest_msg = max(
-            (msg for msg in messages),
-            key=lambda msg: len(msg.get('content', '')),
-            default=None
-        )
-        
         return {
             'filename': filename,
             'timestamp': data.get('timestamp'),
@@ -214,8 +268,8 @@ def get_conversation_stats(filename):
             'user_messages': user_messages,
             'assistant_messages': assistant_messages,
             'estimated_tokens': estimated_tokens,
-            'longest_message_length': len(longest_msg.get('content', '')) if longest_msg else 0,
-            'longest_message_role': longest_msg.get('role') if longest_msg else None
+            'longest_message_length': longest_length,
+            'longest_message_role': longest_role
         }
     
     except Exception as e:
@@ -0,0 +1,32 @@
+"""
+JSON reading and writing through orjson when it is installed, falling back to the json module
+"""
+import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    """Write NumPy arrays as lists when falling back to the json module"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def loads(raw):
+    """Parse JSON from bytes or str"""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def dumps(obj, indent=False):
+    """Serialize to UTF-8 JSON bytes, compact unless indent is set (two spaces)"""
+    if orjson:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_default).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=_default).encode('utf-8')
+
+def load_file(filename):
+    """Read and parse a JSON file"""
+    with open(filename, 'rb') as f:
+        return loads(f.read())
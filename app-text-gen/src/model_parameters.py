@@ -5,23 +5,34 @@ Model parameter management for temperature, max_tokens, etc.
 class ModelParameters:
     """Class to manage model parameters"""
     
+    PARAMETER_NAMES = ('temperature', 'max_tokens', 'top_p', 'frequency_penalty', 'presence_penalty')
+    
     def __init__(self):
         """Initialize with default parameters"""
+        self._cached = None
         self.temperature = 0.7
         self.max_tokens = 500
         self.top_p = 1.0
         self.frequency_penalty = 0.0
         self.presence_penalty = 0.0
     
+    def __setattr__(self, name, value):
+        """Drop the cached parameter dict whenever a parameter changes"""
+        if name in self.PARAMETER_NAMES:
+            object.__setattr__(self, '_cached', None)
+        object.__setattr__(self, name, value)
+    
     def get_all_parameters(self):
-        """Get all parameters as a dictionary"""
-        return {
-            'temperature': self.temperature,
-            'max_tokens': self.max_tokens,
-            'top_p': self.top_p,
-            'frequency_penalty': self.frequency_penalty,
-            'presence_penalty': self.presence_penalty
-        }
+        """Get all parameters as a dictionary (shared between calls; do not mutate)"""
+        if self._cached is None:
+            self._cached = {
+                'temperature': self.temperature,
+                'max_tokens': self.max_tokens,
+                'top_p': self.top_p,
+                'frequency_penalty': self.frequency_penalty,
+                'presence_penalty': self.presence_penalty
+            }
+        return self._cached
     
     def set_temperature(self, value):
         """Set temperature (0.0 to 2.0)"""
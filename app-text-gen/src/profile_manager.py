@@ -3,10 +3,19 @@ User profile management for saving preferences and settings
 """
 import json
 import os
+import time
 from datetime import datetime
 
 PROFILES_DIR = "profiles"
 
+# Profile names from the last directory listing; cleared whenever a profile is written or removed
+PROFILES_CACHE_TTL = 5.0
+_profiles_cache = {"names": None, "name_set": frozenset(), "loaded_at": 0.0}
+
+def invalidate_profiles_cache():
+    """Force the next list_profiles() call to re-read the profiles directory"""
+    _profiles_cache["names"] = None
+
 def ensure_profiles_dir():
     """Create profiles directory if it doesn't exist"""
     if not os.path.exists(PROFILES_DIR):
@@ -41,6 +50,7 @@ def save_profile(profile_data, profile_name="default"):
     with open(profile_path, 'w') as f:
         json.dump(profile_data, f, indent=2)
     
+    invalidate_profiles_cache()
     return profile_path
 
 def load_profile(profile_name="default"):
@@ -57,15 +67,31 @@ def load_profile(profile_name="default"):
         print(f"Error loading profile: {e}")
         return None
 
-def list_profiles():
-    """List all available profiles"""
+def _refresh_profiles_cache():
+    """Re-read the profiles directory if the cached listing is missing or stale"""
+    now = time.monotonic()
+    if _profiles_cache["names"] is not None and now - _profiles_cache["loaded_at"] <= PROFILES_CACHE_TTL:
+        return
+    
     ensure_profiles_dir()
     
     files = []
     if os.path.exists(PROFILES_DIR):
         files = [f[:-5] for f in os.listdir(PROFILES_DIR) if f.endswith('.json')]
     
-    return sorted(files)
+    _profiles_cache["names"] = sorted(files)
+    _profiles_cache["name_set"] = frozenset(files)
+    _profiles_cache["loaded_at"] = now
+
+def list_profiles():
+    """List all available profiles, reusing a listing made within the last few seconds"""
+    _refresh_profiles_cache()
+    return list(_profiles_cache["names"])
+
+def profile_exists(profile_name):
+    """Check whether a profile exists using the cached set of names"""
+    _refresh_profiles_cache()
+    return profile_name in _profiles_cache["name_set"]
 
 def delete_profile(profile_name):
     """Delete a user profile"""
@@ -76,6 +102,7 @@ def delete_profile(profile_name):
     profile_path = get_profile_path(profile_name)
     if os.path.exists(profile_path):
         os.remove(profile_path)
+        invalidate_profiles_cache()
         print(f"Profile '{profile_name}' deleted.")
         return True
     
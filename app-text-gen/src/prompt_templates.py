@@ -135,9 +135,10 @@ def list_all_templates():
     
     return all_templates
 
-def display_templates():
-    """Display all available templates"""
-    templates = list_all_templates()
+def display_templates(templates=None):
+    """Display all available templates (optionally from an already loaded listing)"""
+    if templates is None:
+        templates = list_all_templates()
     
     if not templates:
         print("\nNo templates available.")
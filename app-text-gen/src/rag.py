@@ -5,9 +5,14 @@ from indexed conversations using semantic search.
 
 import os
 import json
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Optional
 from semantic_search import EmbeddingIndex
 
+# Number of recent retrievals kept per engine
+RAG_CACHE_SIZE = 256
+
 
 class RAGEngine:
     """Manages RAG functionality for context-aware responses"""
@@ -19,6 +24,9 @@ class RAGEngine:
         self.similarity_threshold = float(os.getenv("RAG_SIMILARITY_THRESHOLD", "0.15"))
         self.max_context_tokens = int(os.getenv("RAG_MAX_CONTEXT_TOKENS", "2000"))
         self.context_count = int(os.getenv("RAG_CONTEXT_COUNT", "3"))
+        # Repeated queries skip the embedding call; settings and index version are part of the key
+        self._context_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         
     def enable(self):
         """Enable RAG augmentation"""
@@ -57,31 +65,60 @@ class RAGEngine:
         if not self.enabled or not self.embedding_index:
             return [], 0.0
         
+        key = (
+            query,
+            self.similarity_threshold,
+            self.context_count,
+            self.embedding_index.index.get("last_updated")
+        )
+        with self._cache_lock:
+            cached = self._context_cache.get(key)
+            if cached is not None:
+                self._context_cache.move_to_end(key)
+                return cached
+        
         try:
-            # Search all sources (conversations + KB)
-            results = self.embedding_index.search(
-                query,
-                similarity_threshold=self.similarity_threshold,
-                top_k=self.context_count
-            )
-            
-            if not results:
-                return [], 0.0
-            
-            # Calculate average similarity
-            avg_similarity = sum(r['similarity_score'] for r in results) / len(results)
-            return results, avg_similarity
-            
+            context = self._search(query, self.similarity_threshold, self.context_count)
         except Exception as e:
             print(f"[DEBUG] Error retrieving context: {e}")
             return [], 0.0
+        
+        # Empty results are not cached, so a query whose embedding failed is retried next time
+        if context[0]:
+            with self._cache_lock:
+                self._context_cache[key] = context
+                if len(self._context_cache) > RAG_CACHE_SIZE:
+                    self._context_cache.popitem(last=False)
+        return context
+    
+    def _search(self, query: str, similarity_threshold: float,
+                context_count: int) -> Tuple[List[Dict], float]:
+        """Search all sources (conversations + KB) and average the similarity"""
+        results = self.embedding_index.search(
+            query,
+            similarity_threshold=similarity_threshold,
+            top_k=context_count
+        )
+        
+        if not results:
+            return [], 0.0
+        
+        # Embeddings are row views into the index matrix; keeping them would pin it in the cache
+        results = [{k: v for k, v in r.items() if k != "embedding"} for r in results]
+        avg_similarity = sum(r['similarity_score'] for r in results) / len(results)
+        return results, avg_similarity
+    
+    def clear_context_cache(self):
+        """Drop cached retrieval results"""
+        with self._cache_lock:
+            self._context_cache.clear()
     
     def format_context(self, context_results: List[Dict]) -> str:
         """Format retrieved context for inclusion in prompt"""
         if not context_results:
             return ""
         
-        formatted_context = "\n\n=== RELEVANT CONTEXT FROM YOUR KNOWLEDGE BASE ===\n"
+        parts = ["\n\n=== RELEVANT CONTEXT FROM YOUR KNOWLEDGE BASE ===\n"]
         
         for i, result in enumerate(context_results, 1):
             similarity_pct = result['similarity_score'] * 100
@@ -90,18 +127,18 @@ class RAGEngine:
             if result.get('type') == 'kb_document':
                 # KB document chunk
                 doc_title = result.get('doc_title', 'Unknown')
-                formatted_context += f"\n[KB Context {i} - Relevance: {similarity_pct:.1f}%]\n"
-                formatted_context += f"Document: {doc_title}\n"
-                formatted_context += f"Collection: {result.get('collection', 'Unknown')}\n"
-                formatted_context += f"Text: {result.get('text', '')[:300]}...\n"
+                parts.append(f"\n[KB Context {i} - Relevance: {similarity_pct:.1f}%]\n")
+                parts.append(f"Document: {doc_title}\n")
+                parts.append(f"Collection: {result.get('collection', 'Unknown')}\n")
+                parts.append(f"Text: {result.get('text', '')[:300]}...\n")
             else:
                 # Conversation pair
-                formatted_context += f"\n[Conversation {i} - Relevance: {similarity_pct:.1f}%]\n"
-                formatted_context += f"User: {result.get('user_message', '')[:200]}...\n"
-                formatted_context += f"Assistant: {result.get('assistant_message', '')[:200]}...\n"
+                parts.append(f"\n[Conversation {i} - Relevance: {similarity_pct:.1f}%]\n")
+                parts.append(f"User: {result.get('user_message', '')[:200]}...\n")
+                parts.append(f"Assistant: {result.get('assistant_message', '')[:200]}...\n")
         
-        formatted_context += "\n=== END CONTEXT ===\n"
-        return formatted_context
+        parts.append("\n=== END CONTEXT ===\n")
+        return "".join(parts)
     
     def augment_prompt(
         self, 
@@ -152,6 +189,19 @@ class RAGEngine:
             f"{formatted_context}"
         )
     
+    def get_context_message(self, context_results: List[Dict]) -> Optional[Dict]:
+        """Get retrieved context as a separate user message, leaving the system prompt untouched"""
+        if not context_results:
+            return None
+        
+        return {
+            "role": "user",
+            "content": (
+                "Use the following context from previous conversations to provide more accurate and informed responses:\n"
+                f"<context>{self.format_context(context_results)}</context>"
+            )
+        }
+    
     def display_context_info(self, context_results: List[Dict], query: str):
         """Display information about retrieved context"""
         if not context_results:
@@ -187,11 +237,13 @@ def interactive_rag_settings(rag_engine: RAGEngine):
             break
         elif choice == "1":
             rag_engine.toggle()
+            rag_engine.clear_context_cache()
         elif choice == "2":
             try:
                 threshold = float(input("Enter similarity threshold (0.0-1.0): "))
                 if 0.0 <= threshold <= 1.0:
                     rag_engine.similarity_threshold = threshold
+                    rag_engine.clear_context_cache()
                     print(f"✓ Threshold set to {threshold:.2f}")
                 else:
                     print("Invalid range")
@@ -202,6 +254,7 @@ def interactive_rag_settings(rag_engine: RAGEngine):
                 count = int(input("Enter number of context snippets (1-10): "))
                 if 1 <= count <= 10:
                     rag_engine.context_count = count
+                    rag_engine.clear_context_cache()
                     print(f"✓ Context count set to {count}")
                 else:
                     print("Invalid range")
@@ -212,6 +265,7 @@ def interactive_rag_settings(rag_engine: RAGEngine):
                 tokens = int(input("Enter max context tokens (500-5000): "))
                 if 500 <= tokens <= 5000:
                     rag_engine.max_context_tokens = tokens
+                    rag_engine.clear_context_cache()
                     print(f"✓ Max context tokens set to {tokens}")
                 else:
                     print("Invalid range")
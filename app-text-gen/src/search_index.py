@@ -0,0 +1,128 @@
+"""
+Trigram index over saved conversations for narrowing down text searches
+"""
+import json
+import os
+import json_utils
+
+CONVERSATIONS_DIR = "conversations"
+SEARCH_INDEX_FILE = os.path.join(CONVERSATIONS_DIR, ".search_index")
+
+_search_index = None
+
+def get_trigrams(text):
+    """All three-character substrings of the lowercased text"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def get_conversation_trigrams(data):
+    """Trigrams of every searchable field: message contents, system prompt and model"""
+    trigrams = set()
+    for msg in data.get('messages', []):
+        trigrams |= get_trigrams(msg.get('content') or '')
+    trigrams |= get_trigrams(data.get('system_prompt') or '')
+    trigrams |= get_trigrams(data.get('model') or '')
+    return trigrams
+
+def load_search_index():
+    """Return the in-process index, reading it from disk on first use"""
+    global _search_index
+    if _search_index is None:
+        files = {}
+        if os.path.exists(SEARCH_INDEX_FILE):
+            try:
+                with open(SEARCH_INDEX_FILE, 'r', encoding='utf-8') as f:
+                    files = json.load(f)
+            except (OSError, ValueError):
+                pass  # Rebuilt from the conversation files
+        
+        postings = {}
+        for filename, entry in files.items():
+            entry['trigrams'] = set(entry['trigrams'])
+            for trigram in entry['trigrams']:
+                postings.setdefault(trigram, set()).add(filename)
+        _search_index = {"files": files, "postings": postings}
+    return _search_index
+
+def save_search_index():
+    """Write the index to disk"""
+    files = {
+        filename: dict(entry, trigrams=sorted(entry['trigrams']))
+        for filename, entry in load_search_index()["files"].items()
+    }
+    try:
+        with open(SEARCH_INDEX_FILE, 'w', encoding='utf-8') as f:
+            json.dump(files, f, separators=(',', ':'))
+    except OSError:
+        pass  # The index is only an optimization
+
+def remove_from_index(filename):
+    """Drop a conversation and its postings from the index"""
+    index = load_search_index()
+    entry = index["files"].pop(filename, None)
+    if entry:
+        for trigram in entry['trigrams']:
+            filenames = index["postings"].get(trigram)
+            if filenames:
+                filenames.discard(filename)
+                if not filenames:
+                    del index["postings"][trigram]
+
+def refresh_search_index(filenames):
+    """Re-index new or changed conversations and forget missing ones; returns True if anything changed"""
+    index = load_search_index()
+    changed = False
+    
+    for filename in set(index["files"]) - set(filenames):
+        remove_from_index(filename)
+        changed = True
+    
+    for filename in filenames:
+        filepath = os.path.join(CONVERSATIONS_DIR, filename)
+        try:
+            stat = os.stat(filepath)
+            entry = index["files"].get(filename)
+            if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                continue
+            
+            data = json_utils.load_file(filepath)
+            trigrams = get_conversation_trigrams(data)
+        except Exception:
+            # Unreadable or malformed files stay out of the index, so they are always
+            # candidates and the search itself reports them
+            if filename in index["files"]:
+                remove_from_index(filename)
+                changed = True
+            continue
+        
+        remove_from_index(filename)
+        index["files"][filename] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "trigrams": trigrams}
+        for trigram in trigrams:
+            index["postings"].setdefault(trigram, set()).add(filename)
+        changed = True
+    
+    return changed
+
+def find_candidate_files(query, filenames):
+    """
+    Filenames that may contain the query, in the given order
+    
+    A conversation can only contain the query if it has every trigram of it, so the
+    posting lists are intersected; files that could not be indexed are always kept.
+    """
+    if refresh_search_index(filenames):
+        save_search_index()
+    
+    query_trigrams = get_trigrams(query)
+    if not query_trigrams:
+        return list(filenames)  # Too short to narrow down
+    
+    index = load_search_index()
+    candidates = None
+    for trigram in sorted(query_trigrams, key=lambda t: len(index["postings"].get(t, ()))):
+        filenames_with_trigram = index["postings"].get(trigram, set())
+        candidates = filenames_with_trigram.copy() if candidates is None else candidates & filenames_with_trigram
+        if not candidates:
+            break
+    
+    return [f for f in filenames if f in candidates or f not in index["files"]]
@@ -2,12 +2,18 @@
 Semantic Search using Azure OpenAI Embeddings
 Enables searching conversations and documents using embeddings and cosine similarity
 """
-import json
+import hashlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional
-from sklearn.metrics.pairwise import cosine_similarity
+import json_utils
+try:
+    import faiss
+except ImportError:
+    faiss = None
 try:
     from azure.ai.inference import EmbeddingsClient
     from azure.core.credentials import AzureKeyCredential
@@ -18,6 +24,53 @@ except ImportError:
 
 EMBEDDINGS_DIR = "embeddings"
 EMBEDDING_INDEX_FILE = "conversation_embeddings.json"
+# Texts per embeddings request, and how many requests may be in flight at once
+EMBEDDING_BATCH_SIZE = 64
+EMBEDDING_WORKERS = 4
+# Vectors already fetched from the API, stored as float32 .npy files keyed by model and text hash
+EMBEDDING_CACHE_DIR = os.path.join(EMBEDDINGS_DIR, "cache")
+# With faiss installed, KB search over at least this many chunks uses an HNSW index to pick
+# refine_factor * top_k candidates, which are then re-scored exactly
+KB_ANN_MIN_ENTRIES = 1000
+KB_ANN_REFINE_FACTOR = 10
+
+def rank_by_similarity(similarities: np.ndarray, top_k: int, similarity_threshold: float) -> np.ndarray:
+    """Return indices of the top_k scores above the threshold, best first"""
+    matches = np.flatnonzero(similarities >= similarity_threshold)
+    if len(matches) > top_k:
+        matches = matches[np.argpartition(-similarities[matches], top_k - 1)[:top_k]]
+    return matches[np.argsort(-similarities[matches], kind="stable")]
+
+
+def stack_embeddings(entries: List[Dict]) -> Dict:
+    """Stack the entries' embeddings into one float32 matrix with row norms
+    
+    Entries without a vector, or whose dimension differs from the first one, are
+    skipped. Each kept entry's embedding is pointed at its row of the matrix, so
+    the vectors are held once as float32 instead of as lists of Python floats.
+    """
+    entries = [e for e in entries if e.get("embedding") is not None]
+    dimension = len(entries[0]["embedding"]) if entries else 0
+    entries = [e for e in entries if len(e["embedding"]) == dimension]
+    
+    matrix = np.asarray([e["embedding"] for e in entries], dtype=np.float32).reshape(len(entries), dimension)
+    for entry, row in zip(entries, matrix):
+        entry["embedding"] = row
+    
+    return {
+        "entries": entries,
+        "dimension": dimension,
+        "matrix": matrix,
+        "norms": np.linalg.norm(matrix, axis=1)
+    }
+
+
+def block_scores(block: Dict, query_vector: np.ndarray, query_norm: float) -> Optional[np.ndarray]:
+    """Cosine similarity of the query against every row of a stacked block, or None if it cannot be scored"""
+    if not block["entries"] or len(query_vector) != block["dimension"]:
+        return None
+    return (block["matrix"] @ query_vector) / np.maximum(block["norms"] * query_norm, 1e-12)
+
 
 class AzureEmbeddings:
     """Handle Azure OpenAI Embeddings API calls"""
@@ -50,8 +103,43 @@ class AzureEmbeddings:
         )
         print("[INFO] Using OpenAI SDK configured for Azure")
     
+    def _cache_path(self, text: str) -> str:
+        """Get the cache file for a text under the current embedding model"""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return os.path.join(EMBEDDING_CACHE_DIR, self.deployment, digest[:2], f"{digest}.npy")
+    
+    def _load_cached(self, text: str) -> Optional[List[float]]:
+        """Load a cached embedding, or None on a miss"""
+        path = self._cache_path(text)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path).tolist()
+        except Exception:
+            return None
+    
+    def _store_cached(self, text: str, embedding: List[float]):
+        """Write an embedding to the on-disk cache"""
+        path = self._cache_path(text)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.save(path, np.asarray(embedding, dtype=np.float32))
+        except Exception as e:
+            print(f"Warning: Could not cache embedding: {e}")
+    
     def embed_text(self, text: str) -> List[float]:
-        """Embed a single text string"""
+        """Embed a single text string, reusing a cached vector when available"""
+        cached = self._load_cached(text)
+        if cached is not None:
+            return cached
+        
+        embedding = self._embed_text_uncached(text)
+        if embedding is not None:
+            self._store_cached(text, embedding)
+        return embedding
+    
+    def _embed_text_uncached(self, text: str) -> List[float]:
+        """Embed a single text string with the API"""
         try:
             if self.use_openai_sdk:
                 response = self.client.embeddings.create(
@@ -70,7 +158,23 @@ class AzureEmbeddings:
             return None
     
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        """Embed multiple texts efficiently"""
+        """Embed multiple texts, requesting only those not already cached"""
+        embeddings = [self._load_cached(text) for text in texts]
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not misses:
+            return embeddings
+        
+        fetched = self._embed_batch_uncached([texts[i] for i in misses])
+        if fetched is None:
+            return None
+        
+        for i, embedding in zip(misses, fetched):
+            embeddings[i] = embedding
+            self._store_cached(texts[i], embedding)
+        return embeddings
+    
+    def _embed_batch_uncached(self, texts: List[str]) -> List[List[float]]:
+        """Embed multiple texts efficiently with the API"""
         try:
             if self.use_openai_sdk:
                 response = self.client.embeddings.create(
@@ -91,6 +195,24 @@ class AzureEmbeddings:
             print(f"Error embedding batch: {e}")
             return None
 
+    def embed_many(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE,
+                   max_workers: int = EMBEDDING_WORKERS) -> List[Optional[List[float]]]:
+        """Embed any number of texts in fixed-size batches sent concurrently
+        
+        Returns one embedding per text, or None for texts whose batch failed.
+        """
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        if not batches:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            results = list(executor.map(self.embed_batch, batches))
+        
+        embeddings = []
+        for batch, batch_embeddings in zip(batches, results):
+            embeddings.extend(batch_embeddings if batch_embeddings else [None] * len(batch))
+        return embeddings
+
 class EmbeddingIndex:
     """Manage conversation embeddings and semantic search"""
     
@@ -98,6 +220,14 @@ class EmbeddingIndex:
         """Initialize embedding index"""
         self.embeddings_client = AzureEmbeddings()
         self.index = self._load_index()
+        self._vectors = None
+        # Bumped whenever KB or conversation entries change, so each vector block
+        # is rebuilt only when its own entries do
+        self._kb_version = 0
+        self._conversation_version = 0
+        # Exchanges are indexed from a background thread, so every change to
+        # self.index (and its save) and every vector cache rebuild holds this lock
+        self._lock = threading.RLock()
     
     def _ensure_dir(self):
         """Create embeddings directory if it doesn't exist"""
@@ -114,8 +244,7 @@ class EmbeddingIndex:
         
         if os.path.exists(index_path):
             try:
-                with open(index_path, 'r') as f:
-                    return json.load(f)
+                return json_utils.load_file(index_path)
             except Exception as e:
                 print(f"Error loading index: {e}")
                 return {"entries": [], "last_updated": None}
@@ -127,9 +256,15 @@ class EmbeddingIndex:
         self._ensure_dir()
         index_path = self._get_index_path()
         
+        temp_path = index_path + ".tmp"
+        
         try:
-            with open(index_path, 'w') as f:
-                json.dump(self.index, f, indent=2)
+            with self._lock:
+                # Cached embeddings are float32 rows, which json_utils writes as plain lists
+                with open(temp_path, 'wb') as f:
+                    f.write(json_utils.dumps(self.index, indent=True))
+                # Readers never see a half-written index
+                os.replace(temp_path, index_path)
         except Exception as e:
             print(f"Error saving index: {e}")
     
@@ -186,26 +321,58 @@ class EmbeddingIndex:
             return
         
         # Add to index
-        for metadata, embedding in zip(pair_metadata, embeddings):
-            entry = {
-                **metadata,
-                "embedding": embedding,
-                "similarity_score": None
-            }
+        with self._lock:
+            for metadata, embedding in zip(pair_metadata, embeddings):
+                entry = {
+                    **metadata,
+                    "embedding": embedding,
+                    "similarity_score": None
+                }
+                
+                self._upsert_entry(entry)
             
-            # Check if entry already exists and update
-            existing = [e for e in self.index["entries"] if e.get("pair_id") == metadata["pair_id"]]
-            if existing:
-                idx = self.index["entries"].index(existing[0])
-                self.index["entries"][idx] = entry
-            else:
-                self.index["entries"].append(entry)
-        
-        self.index["last_updated"] = datetime.now().isoformat()
-        self._save_index()
+            self._conversation_version += 1
+            self.index["last_updated"] = datetime.now().isoformat()
+            self._save_index()
         
         print(f"  ✓ Indexed {len(pairs_to_embed)} message pairs")
     
+    def _upsert_entry(self, entry: Dict):
+        """Replace the entry with the same pair_id, or append it"""
+        existing = [e for e in self.index["entries"] if e.get("pair_id") == entry["pair_id"]]
+        if existing:
+            idx = self.index["entries"].index(existing[0])
+            self.index["entries"][idx] = entry
+        else:
+            self.index["entries"].append(entry)
+    
+    def index_message_pair(self, conversation_id: str, pair_index: int, user_message: str,
+                           assistant_message: str, system_prompt: str, model: str) -> bool:
+        """Embed and index a single user/assistant exchange without console output"""
+        combined_text = f"User: {user_message}\n\nAssistant: {assistant_message}"
+        embedding = self.embeddings_client.embed_text(combined_text)
+        
+        if embedding is None:
+            return False
+        
+        with self._lock:
+            self._upsert_entry({
+                "pair_id": f"{conversation_id}_pair_{pair_index}",
+                "conversation_id": conversation_id,
+                "user_message": user_message,
+                "assistant_message": assistant_message,
+                "pair_index": pair_index,
+                "model": model,
+                "system_prompt": system_prompt,
+                "timestamp": datetime.now().isoformat(),
+                "embedding": embedding,
+                "similarity_score": None
+            })
+            self._conversation_version += 1
+            self.index["last_updated"] = datetime.now().isoformat()
+            self._save_index()
+        return True
+    
     def search(self, query: str, top_k: int = 5, similarity_threshold: float = 0.5) -> List[Dict]:
         """
         Search the embedding index using semantic similarity
@@ -218,8 +385,9 @@ class EmbeddingIndex:
         Returns:
             List of matching entries sorted by similarity
         """
-        if not self.index["entries"]:
-            return []
+        with self._lock:
+            if not self.index["entries"]:
+                return []
         
         # Embed the query
         print(f"\nSearching embeddings for: '{query}'")
@@ -229,27 +397,31 @@ class EmbeddingIndex:
             print("Error embedding query")
             return []
         
-        # Convert to numpy array
-        query_vector = np.array([query_embedding])
+        with self._lock:
+            vectors = self._get_vectors()
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = max(float(np.linalg.norm(query_vector)), 1e-12)
+        
+        # Score the conversation and KB blocks, then rank them together
+        entries = []
+        scores = []
+        for block in (vectors["conversations"], vectors["kb"]):
+            block_similarities = block_scores(block, query_vector, query_norm)
+            if block_similarities is not None:
+                entries.extend(block["entries"])
+                scores.append(block_similarities)
+        
+        if not entries:
+            return []
+        similarities = np.concatenate(scores)
         
-        # Calculate similarity scores
         results = []
+        for i in rank_by_similarity(similarities, top_k, similarity_threshold):
+            result = entries[i].copy()
+            result["similarity_score"] = float(similarities[i])
+            results.append(result)
         
-        for entry in self.index["entries"]:
-            embedding = np.array([entry["embedding"]])
-            
-            # Calculate cosine similarity
-            similarity = cosine_similarity(query_vector, embedding)[0][0]
-            
-            if similarity >= similarity_threshold:
-                result = entry.copy()
-                result["similarity_score"] = float(similarity)
-                results.append(result)
-        
-        # Sort by similarity (descending)
-        results.sort(key=lambda x: x["similarity_score"], reverse=True)
-        
-        return results[:top_k]
+        return results
     
     def search_by_conversation(self, query: str, conversation_id: str, 
                               top_k: int = 3) -> List[Dict]:
@@ -266,7 +438,8 @@ class EmbeddingIndex:
     
     def get_index_stats(self) -> Dict:
         """Get statistics about the embedding index"""
-        entries = self.index.get("entries", [])
+        with self._lock:
+            entries = list(self.index.get("entries", []))
         
         # Count by conversation
         conversations = set(e.get("conversation_id") for e in entries)
@@ -307,62 +480,70 @@ class EmbeddingIndex:
         indexed_count = 0
         failed_count = 0
         
+        # Gather chunks from every document first so they can be embedded in shared batches
+        pending_docs = []
+        chunk_texts = []
         for doc in documents:
             if doc.get("indexed", False):
                 print(f"  - {doc['title']}: already indexed")
                 continue
             
-            try:
-                # Get chunks for this document
-                chunks = doc.get("chunks", [])
-                if not chunks:
-                    print(f"  - {doc['title']}: no chunks found")
-                    continue
-                
-                # Extract chunk texts
-                chunk_texts = [c["text"] for c in chunks]
-                
-                print(f"  - Indexing {doc['title']} ({len(chunks)} chunks)...")
-                
-                # Generate embeddings for chunks
-                embeddings = self.embeddings_client.embed_batch(chunk_texts)
-                
-                if not embeddings:
-                    print(f"    Error: Could not generate embeddings")
+            chunks = doc.get("chunks", [])
+            if not chunks:
+                print(f"  - {doc['title']}: no chunks found")
+                continue
+            
+            print(f"  - Indexing {doc['title']} ({len(chunks)} chunks)...")
+            pending_docs.append((doc, len(chunk_texts)))
+            chunk_texts.extend(c["text"] for c in chunks)
+        
+        # Generate embeddings for all chunks
+        embeddings = self.embeddings_client.embed_many(chunk_texts)
+        
+        with self._lock:
+            for doc, offset in pending_docs:
+                try:
+                    chunks = doc["chunks"]
+                    doc_embeddings = embeddings[offset:offset + len(chunks)]
+                    
+                    if len(doc_embeddings) != len(chunks) or any(e is None for e in doc_embeddings):
+                        print(f"    Error: Could not generate embeddings for {doc['title']}")
+                        failed_count += 1
+                        continue
+                    
+                    # Create index entries for each chunk
+                    for i, (chunk, embedding) in enumerate(zip(chunks, doc_embeddings)):
+                        entry = {
+                            "id": f"{doc['id']}_chunk_{i}",
+                            "type": "kb_document",
+                            "doc_id": doc['id'],
+                            "doc_title": doc['title'],
+                            "collection": doc['collection'],
+                            "chunk_index": i,
+                            "text": chunk["text"],
+                            "word_count": chunk["word_count"],
+                            "embedding": embedding,
+                            "model": "text-embedding-3-small",
+                            "timestamp": datetime.now().isoformat(),
+                            "filepath": doc['filepath']
+                        }
+                        self.index["entries"].append(entry)
+                    
+                    indexed_count += 1
+                    print(f"    [+] {doc['title']}: indexed successfully ({len(chunks)} chunks added)")
+                    
+                    # Mark document as indexed
+                    doc["indexed"] = True
+                    
+                except Exception as e:
+                    print(f"    Error indexing {doc['title']}: {e}")
                     failed_count += 1
-                    continue
-                
-                # Create index entries for each chunk
-                for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                    entry = {
-                        "id": f"{doc['id']}_chunk_{i}",
-                        "type": "kb_document",
-                        "doc_id": doc['id'],
-                        "doc_title": doc['title'],
-                        "collection": doc['collection'],
-                        "chunk_index": i,
-                        "text": chunk["text"],
-                        "word_count": chunk["word_count"],
-                        "embedding": embedding,
-                        "model": "text-embedding-3-small",
-                        "timestamp": datetime.now().isoformat(),
-                        "filepath": doc['filepath']
-                    }
-                    self.index["entries"].append(entry)
-                
-                indexed_count += 1
-                print(f"    [+] Indexed successfully ({len(chunks)} chunks added)")
-                
-                # Mark document as indexed
-                doc["indexed"] = True
-                
-            except Exception as e:
-                print(f"    Error indexing {doc['title']}: {e}")
-                failed_count += 1
-        
-        # Save updated index
-        self.index["last_updated"] = datetime.now().isoformat()
-        self._save_index()
+            
+            # Save updated index
+            if indexed_count:
+                self._kb_version += 1
+            self.index["last_updated"] = datetime.now().isoformat()
+            self._save_index()
         
         result = {
             "indexed": indexed_count,
@@ -379,7 +560,44 @@ class EmbeddingIndex:
         
         return result
     
-    def search_kb_only(self, query: str, top_k: int = 5, similarity_threshold: float = 0.5) -> List[Dict]:
+    def _get_vectors(self) -> Dict:
+        """Build (or reuse) float32 matrices of the KB and conversation embeddings
+        
+        Each block is rebuilt only when its version counter has moved, so indexing a
+        chat exchange leaves the KB matrix and its ANN index alone. A fresh dict is
+        returned on every rebuild, so callers may read it after releasing the lock.
+        Call with self._lock held.
+        """
+        vectors = self._vectors
+        if (vectors is not None and vectors["kb_version"] == self._kb_version
+                and vectors["conversation_version"] == self._conversation_version):
+            return vectors
+        vectors = dict(vectors or {"kb_version": None, "conversation_version": None})
+        
+        if vectors["kb_version"] != self._kb_version:
+            kb = stack_embeddings([e for e in self.index["entries"] if e.get("type") == "kb_document"])
+            
+            ann_index = None
+            if faiss is not None and len(kb["entries"]) >= KB_ANN_MIN_ENTRIES:
+                # Inner product over unit vectors is cosine similarity
+                unit_vectors = kb["matrix"] / np.maximum(kb["norms"], 1e-12)[:, None]
+                ann_index = faiss.IndexHNSWFlat(kb["dimension"], 32, faiss.METRIC_INNER_PRODUCT)
+                ann_index.hnsw.efConstruction = 200
+                ann_index.add(unit_vectors)
+            
+            vectors.update(kb=kb, ann_index=ann_index, kb_version=self._kb_version)
+        
+        if vectors["conversation_version"] != self._conversation_version:
+            vectors["conversations"] = stack_embeddings(
+                [e for e in self.index["entries"] if e.get("type") != "kb_document"]
+            )
+            vectors["conversation_version"] = self._conversation_version
+        
+        self._vectors = vectors
+        return vectors
+    
+    def search_kb_only(self, query: str, top_k: int = 5, similarity_threshold: float = 0.5,
+                       refine_factor: int = KB_ANN_REFINE_FACTOR) -> List[Dict]:
         """
         Search only KB documents (not conversations)
         
@@ -387,6 +605,7 @@ class EmbeddingIndex:
             query: Search query string
             top_k: Number of top results to return
             similarity_threshold: Minimum similarity score
+            refine_factor: Candidates per result to re-score when an HNSW index is used
         
         Returns:
             List of KB document chunks matching the query
@@ -400,28 +619,39 @@ class EmbeddingIndex:
         if query_embedding is None:
             return []
         
-        # Convert to numpy array
-        query_vector = np.array([query_embedding])
+        # Score every KB chunk at once against the cached matrix
+        with self._lock:
+            vectors = self._get_vectors()
+        kb_vectors = vectors["kb"]
+        if not kb_vectors["entries"] or len(query_embedding) != kb_vectors["dimension"]:
+            return []
         
-        # Search only KB entries
-        results = []
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = max(float(np.linalg.norm(query_vector)), 1e-12)
         
-        for entry in self.index["entries"]:
-            if entry.get("type") != "kb_document":
-                continue
-            
-            embedding = np.array([entry["embedding"]])
-            similarity = cosine_similarity(query_vector, embedding)[0][0]
-            
-            if similarity >= similarity_threshold:
-                result = entry.copy()
-                result["similarity_score"] = float(similarity)
-                results.append(result)
+        if vectors["ann_index"] is not None:
+            # Narrow down to approximate neighbours, then score only those exactly
+            _, neighbours = vectors["ann_index"].search(
+                (query_vector / query_norm).reshape(1, -1), top_k * refine_factor
+            )
+            candidates = neighbours[0][neighbours[0] >= 0]
+            matrix = kb_vectors["matrix"][candidates]
+            norms = kb_vectors["norms"][candidates]
+        else:
+            candidates = None
+            matrix = kb_vectors["matrix"]
+            norms = kb_vectors["norms"]
         
-        # Sort by similarity (descending)
-        results.sort(key=lambda x: x["similarity_score"], reverse=True)
+        similarities = (matrix @ query_vector) / np.maximum(norms * query_norm, 1e-12)
         
-        return results[:top_k]
+        results = []
+        for i in rank_by_similarity(similarities, top_k, similarity_threshold):
+            entry_index = i if candidates is None else candidates[i]
+            result = kb_vectors["entries"][entry_index].copy()
+            result["similarity_score"] = float(similarities[i])
+            results.append(result)
+        
+        return results
     
     def search_conversations_only(self, query: str, top_k: int = 5, similarity_threshold: float = 0.5) -> List[Dict]:
         """
@@ -444,28 +674,22 @@ class EmbeddingIndex:
         if query_embedding is None:
             return []
         
-        # Convert to numpy array
-        query_vector = np.array([query_embedding])
-        
         # Search only conversation entries
-        results = []
-        
-        for entry in self.index["entries"]:
-            if entry.get("type") == "kb_document":
-                continue
-            
-            embedding = np.array([entry["embedding"]])
-            similarity = cosine_similarity(query_vector, embedding)[0][0]
-            
-            if similarity >= similarity_threshold:
-                result = entry.copy()
-                result["similarity_score"] = float(similarity)
-                results.append(result)
+        with self._lock:
+            conversations = self._get_vectors()["conversations"]
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = max(float(np.linalg.norm(query_vector)), 1e-12)
+        similarities = block_scores(conversations, query_vector, query_norm)
+        if similarities is None:
+            return []
         
-        # Sort by similarity (descending)
-        results.sort(key=lambda x: x["similarity_score"], reverse=True)
+        results = []
+        for i in rank_by_similarity(similarities, top_k, similarity_threshold):
+            result = conversations["entries"][i].copy()
+            result["similarity_score"] = float(similarities[i])
+            results.append(result)
         
-        return results[:top_k]
+        return results
     
     def display_index_stats(self):
         """Display embedding index statistics"""
@@ -5,10 +5,38 @@ import json
 import os
 from datetime import datetime
 from collections import defaultdict
+from functools import lru_cache
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
 STATS_DIR = "statistics"
 STATS_FILE = "usage_stats.json"
 
+@lru_cache(maxsize=1)
+def get_token_encoding():
+    """Load the cl100k_base tokenizer once, or None if it is unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"Warning: Token encoding not available: {e}")
+        return None
+
+def count_tokens(text):
+    """Count tokens with tiktoken, falling back to a whitespace word count"""
+    encoding = get_token_encoding()
+    if encoding is None:
+        return len(text.split())
+    return len(encoding.encode_ordinary(text))
+
+@lru_cache(maxsize=256)
+def count_system_prompt_tokens(system_prompt):
+    """Count tokens in a system prompt, cached since it rarely changes"""
+    return count_tokens(system_prompt)
+
 def ensure_stats_dir():
     """Create statistics directory if it doesn't exist"""
     if not os.path.exists(STATS_DIR):
@@ -0,0 +1,7 @@
+"""
+Shared test setup: the app modules live in src/ and import each other by bare name
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
@@ -0,0 +1,165 @@
+"""
+Tests for the batch job result log, its compaction and the batch index
+"""
+import json
+import os
+
+import pytest
+
+import batch_processing
+
+
+@pytest.fixture(autouse=True)
+def batch_workdir(tmp_path, monkeypatch):
+    """Run each test in an empty directory with no open result logs or active jobs"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(batch_processing, "_response_logs", {})
+    monkeypatch.setattr(batch_processing, "_uncompacted_counts", {})
+    monkeypatch.setattr(batch_processing, "_active_jobs", {})
+    yield
+    for log_file in batch_processing._response_logs.values():
+        log_file.close()
+
+
+def read_job(job_name):
+    with open(os.path.join(batch_processing.BATCH_DIR, f"{job_name}.json"), 'rb') as f:
+        return json.loads(f.read())
+
+
+def write_log(job_name, lines):
+    with open(batch_processing.get_responses_filename(job_name), 'w', encoding='utf-8') as f:
+        f.write("".join(lines))
+
+
+def test_apply_response_log_merges_results_into_job():
+    batch_processing.create_batch_job(["a", "b", "c"], "m", job_name="job")
+    write_log("job", [
+        json.dumps({"id": 1, "status": "completed", "response": "A", "timestamp": "t1"}) + "\n",
+        json.dumps({"id": 2, "status": "failed"}) + "\n",
+    ])
+    
+    merged = batch_processing.apply_response_log(read_job("job"))
+    
+    assert [p['status'] for p in merged['prompts']] == ["completed", "failed", "pending"]
+    assert merged['prompts'][0]['response'] == "A"
+    assert merged['prompts'][0]['timestamp'] == "t1"
+    assert merged['statistics'] == {"total": 3, "completed": 1, "failed": 1, "pending": 1}
+
+
+def test_apply_response_log_skips_torn_lines_and_folded_records():
+    batch_processing.create_batch_job(["a", "b"], "m", job_name="job")
+    write_log("job", [
+        json.dumps({"id": 1, "status": "completed", "response": "A"}) + "\n",
+        json.dumps({"id": 1, "status": "completed", "response": "again"}) + "\n",
+        json.dumps({"id": 99, "status": "completed", "response": "unknown"}) + "\n",
+        '{"id": 2, "status": "comp',
+    ])
+    
+    merged = batch_processing.apply_response_log(read_job("job"))
+    
+    assert merged['prompts'][0]['response'] == "A"
+    assert merged['prompts'][1]['status'] == "pending"
+    assert merged['statistics'] == {"total": 2, "completed": 1, "failed": 0, "pending": 1}
+
+
+def test_apply_response_log_without_log_returns_job_unchanged():
+    _, job_data = batch_processing.create_batch_job(["a"], "m", job_name="job")
+    
+    assert batch_processing.apply_response_log(read_job("job")) == job_data
+
+
+def test_compact_batch_job_folds_log_into_job_file():
+    batch_processing.create_batch_job(["a", "b"], "m", job_name="job")
+    batch_processing.update_batch_response("job", 1, "A")
+    batch_processing.mark_batch_failed("job", 2)
+    
+    assert batch_processing.compact_batch_job("job") is True
+    
+    assert not os.path.exists(batch_processing.get_responses_filename("job"))
+    assert "job" not in batch_processing._response_logs
+    job_data = read_job("job")
+    assert [p['status'] for p in job_data['prompts']] == ["completed", "failed"]
+    assert job_data['prompts'][0]['response'] == "A"
+    assert job_data['statistics'] == {"total": 2, "completed": 1, "failed": 1, "pending": 0}
+
+
+def test_compact_batch_job_without_log_does_nothing():
+    batch_processing.create_batch_job(["a"], "m", job_name="job")
+    
+    assert batch_processing.compact_batch_job("job") is False
+    assert read_job("job")['statistics']['pending'] == 1
+
+
+def test_results_are_compacted_every_batch_compact_every(monkeypatch):
+    monkeypatch.setattr(batch_processing, "BATCH_COMPACT_EVERY", 2)
+    batch_processing.create_batch_job(["a", "b", "c"], "m", job_name="job")
+    
+    batch_processing.update_batch_response("job", 1, "A")
+    assert read_job("job")['statistics']['completed'] == 0
+    batch_processing.update_batch_response("job", 2, "B")
+    
+    assert read_job("job")['statistics']['completed'] == 2
+    assert not os.path.exists(batch_processing.get_responses_filename("job"))
+    assert batch_processing.load_batch_job("job")['statistics']['pending'] == 1
+
+
+def read_index_names():
+    with open(batch_processing.BATCH_INDEX_FILE, 'r', encoding='utf-8') as f:
+        return sorted(json.loads(line)['name'] for line in f)
+
+
+def test_list_batch_jobs_builds_index_from_job_files():
+    batch_processing.create_batch_job(["a"], "m", job_name="one")
+    batch_processing.create_batch_job(["b"], "m", job_name="two")
+    
+    assert sorted(job['name'] for job in batch_processing.list_batch_jobs()) == ["one", "two"]
+    assert read_index_names() == ["one", "two"]
+
+
+def test_read_batch_index_drops_jobs_whose_file_is_gone():
+    batch_processing.create_batch_job(["a"], "m", job_name="one")
+    batch_processing.create_batch_job(["b"], "m", job_name="two")
+    batch_processing.list_batch_jobs()
+    
+    os.remove(os.path.join(batch_processing.BATCH_DIR, "one.json"))
+    
+    assert [s['name'] for s in batch_processing.read_batch_index()] == ["two"]
+    assert read_index_names() == ["two"]
+
+
+def test_read_batch_index_adds_job_files_missing_from_index():
+    batch_processing.create_batch_job(["a"], "m", job_name="one")
+    batch_processing.list_batch_jobs()
+    
+    # Written without going through the index, e.g. copied in from another machine
+    job_data = dict(read_job("one"), name="copied")
+    batch_processing.save_batch_job(job_data)
+    
+    summaries = {s['name']: s for s in batch_processing.read_batch_index()}
+    assert sorted(summaries) == ["copied", "one"]
+    assert summaries["copied"]['statistics']['total'] == 1
+    assert read_index_names() == ["copied", "one"]
+
+
+def test_read_batch_index_ignores_result_logs_and_the_index_itself():
+    batch_processing.create_batch_job(["a"], "m", job_name="one")
+    batch_processing.list_batch_jobs()
+    batch_processing.update_batch_response("one", 1, "A")
+    
+    assert [s['name'] for s in batch_processing.read_batch_index()] == ["one"]
+    assert batch_processing.list_batch_jobs()[0]['statistics']['completed'] == 1
+
+
+def test_read_batch_index_keeps_latest_summary_and_compacts(monkeypatch):
+    monkeypatch.setattr(batch_processing, "BATCH_COMPACT_EVERY", 2)
+    batch_processing.create_batch_job(["a", "b"], "m", job_name="one")
+    batch_processing.list_batch_jobs()
+    for prompt_id in (1, 2):
+        batch_processing.update_batch_response("one", prompt_id, "done")
+    for _ in range(3):
+        batch_processing.append_index_entry(read_job("one"))
+    
+    summaries = batch_processing.read_batch_index()
+    
+    assert summaries[0]['statistics']['completed'] == 2
+    assert read_index_names() == ["one"]
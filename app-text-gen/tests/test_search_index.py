@@ -0,0 +1,99 @@
+"""
+Tests for narrowing conversation searches with the trigram index
+"""
+import json
+import os
+
+import pytest
+
+import search_index
+
+
+@pytest.fixture(autouse=True)
+def conversations_dir(tmp_path, monkeypatch):
+    """Run each test against an empty conversations directory and a fresh index"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(search_index, "_search_index", None)
+    os.makedirs(search_index.CONVERSATIONS_DIR)
+
+
+def write_conversation(filename, *contents, system_prompt="You are a helpful assistant.", model="gpt-4o"):
+    data = {
+        "system_prompt": system_prompt,
+        "model": model,
+        "messages": [{"role": "user", "content": content} for content in contents]
+    }
+    with open(os.path.join(search_index.CONVERSATIONS_DIR, filename), 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_get_trigrams_is_case_insensitive():
+    assert search_index.get_trigrams("AbCd") == {"abc", "bcd"}
+    assert search_index.get_trigrams("ab") == set()
+
+
+def test_candidates_are_files_with_every_query_trigram():
+    write_conversation("a.json", "the quick brown fox")
+    write_conversation("b.json", "a slow brown dog")
+    write_conversation("c.json", "nothing here")
+    
+    filenames = ["a.json", "b.json", "c.json"]
+    assert search_index.find_candidate_files("Brown", filenames) == ["a.json", "b.json"]
+    assert search_index.find_candidate_files("quick", filenames) == ["a.json"]
+    assert search_index.find_candidate_files("zebra", filenames) == []
+
+
+def test_candidates_keep_the_given_order():
+    write_conversation("a.json", "shared text")
+    write_conversation("b.json", "shared text")
+    
+    assert search_index.find_candidate_files("shared", ["b.json", "a.json"]) == ["b.json", "a.json"]
+
+
+def test_system_prompt_and_model_are_indexed():
+    write_conversation("a.json", "hello", system_prompt="Talk like a pirate")
+    write_conversation("b.json", "hello", model="mistral-large")
+    
+    filenames = ["a.json", "b.json"]
+    assert search_index.find_candidate_files("pirate", filenames) == ["a.json"]
+    assert search_index.find_candidate_files("mistral", filenames) == ["b.json"]
+
+
+def test_short_queries_keep_every_file():
+    write_conversation("a.json", "abc")
+    write_conversation("b.json", "xyz")
+    
+    assert search_index.find_candidate_files("ab", ["a.json", "b.json"]) == ["a.json", "b.json"]
+
+
+def test_malformed_files_are_always_candidates():
+    write_conversation("a.json", "brown fox")
+    with open(os.path.join(search_index.CONVERSATIONS_DIR, "broken.json"), 'w', encoding='utf-8') as f:
+        f.write('{"messages": [')
+    
+    assert search_index.find_candidate_files("zebra", ["a.json", "broken.json"]) == ["broken.json"]
+    assert "broken.json" not in search_index.load_search_index()["files"]
+
+
+def test_changed_and_removed_files_are_reindexed():
+    write_conversation("a.json", "brown fox")
+    write_conversation("b.json", "brown dog")
+    assert search_index.find_candidate_files("fox", ["a.json", "b.json"]) == ["a.json"]
+    
+    write_conversation("a.json", "grey wolf and a much longer message")
+    assert search_index.find_candidate_files("fox", ["a.json", "b.json"]) == []
+    assert search_index.find_candidate_files("wolf", ["a.json", "b.json"]) == ["a.json"]
+    
+    assert search_index.find_candidate_files("brown", ["b.json"]) == ["b.json"]
+    assert set(search_index.load_search_index()["files"]) == {"b.json"}
+
+
+def test_index_is_saved_and_reloaded():
+    write_conversation("a.json", "brown fox")
+    search_index.find_candidate_files("fox", ["a.json"])
+    
+    search_index._search_index = None
+    index = search_index.load_search_index()
+    
+    assert "fox" in index["files"]["a.json"]["trigrams"]
+    assert index["postings"]["fox"] == {"a.json"}